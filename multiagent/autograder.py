@@ -24,6 +24,8 @@ import random
 random.seed(0)
 try:
     from pacman import GameState
+    # Some tests count the game states an agent explores
+    GameState.setExploredTracker(set())
 except:
     pass
 
@@ -70,7 +70,7 @@ class ReflexAgent(Agent):
         INF = 999999
         successorGameState = currentGameState.generatePacmanSuccessor(action)
         newPos = successorGameState.getPacmanPosition()
-        newFood = successorGameState.getFood()
+        newFood = successorGameState.getFoodPositions()
         newGhostStates = successorGameState.getGhostStates()
         newScaredTimes = [ghostState.scaredTimer for ghostState in newGhostStates]
         capsules = successorGameState.getCapsules()
@@ -87,7 +87,7 @@ class ReflexAgent(Agent):
             ghostDistance = 4
 
         food_distance = INF
-        for food in newFood.asList():
+        for food in newFood:
             new_dist = manhattanDistance(food, newPos)
             if new_dist < food_distance:
                 food_distance = new_dist
@@ -323,9 +323,9 @@ def betterEvaluationFunction(currentGameState):
     "*** YOUR CODE HERE ***"
     depth = 2
     score = max_value(currentGameState,depth)
-    newFood = currentGameState.getFood()
+    newFood = currentGameState.getFoodPositions()
     food_distance = 999999
-    for food in newFood.asList():
+    for food in newFood:
         new_dist = manhattanDistance(food, currentGameState.getPacmanPosition())
         if new_dist < food_distance:
             food_distance = new_dist
@@ -0,0 +1,111 @@
+# successorbench.py
+# -----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Measures how many game states per second a Pacman agent generates while
+choosing its moves, with the GameState.explored tracking turned off (as in
+pacman.py) and on (as in the autograder).
+
+The agent first plays a few moves against random ghosts to collect the
+states it is timed on, so both runs search exactly the same trees:
+
+> python successorbench.py
+> python successorbench.py -p AlphaBetaAgent -a depth=3 -l smallClassic -m 20
+"""
+
+import random
+import time
+import layout
+import pacman
+from ghostAgents import RandomGhost
+
+
+class SuccessorCounter:
+    """
+    An exploration tracker that only counts the states it is given, two per
+    successor generated.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, state):
+        self.count += 1
+
+
+def collectStates(agent, gameLayout, numMoves, seed=0):
+    "Returns the first numMoves states in which agent chooses a move, playing against random ghosts"
+    random.seed(seed)
+    state = pacman.GameState()
+    state.initialize(gameLayout, gameLayout.getNumGhosts())
+    ghosts = [RandomGhost(i + 1) for i in range(gameLayout.getNumGhosts())]
+    states = []
+    while len(states) < numMoves and not (state.isWin() or state.isLose()):
+        states.append(state)
+        state = state.generateSuccessor(0, agent.getAction(state))
+        for ghost in ghosts:
+            if state.isWin() or state.isLose():
+                break
+            state = state.generateSuccessor(
+                ghost.index, ghost.getAction(state))
+    return states
+
+
+def timeAgent(agent, states, tracker):
+    "Returns the seconds agent takes to choose a move in every state, with tracker recording explored states"
+    pacman.GameState.setExploredTracker(tracker)
+    start = time.perf_counter()
+    for state in states:
+        agent.getAction(state)
+    seconds = time.perf_counter() - start
+    pacman.GameState.setExploredTracker(None)
+    return seconds
+
+
+def runBench(agent, gameLayout, numMoves):
+    states = collectStates(agent, gameLayout, numMoves)
+    counter = SuccessorCounter()
+    timeAgent(agent, states, counter)
+    successors = counter.count // 2
+
+    offSeconds = timeAgent(agent, states, None)
+    onSeconds = timeAgent(agent, states, set())
+    print('%d moves, %d successors' % (len(states), successors))
+    print('explored tracking off: %8.0f successors/second' %
+          (successors / offSeconds))
+    print('explored tracking on:  %8.0f successors/second (%.2fx slower)' %
+          (successors / onSeconds, onSeconds / offSeconds))
+
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser(
+        description='Measure the successor rate of a Pacman agent')
+    parser.add_option('-p', '--pacman', dest='pacman', default='MinimaxAgent',
+                      help='the agent TYPE in a *Agents.py module (default %default)')
+    parser.add_option('-a', '--agentArgs', dest='agentArgs', default='depth=2',
+                      help='comma separated values sent to the agent (default %default)')
+    parser.add_option('-l', '--layout', dest='layout', default='mediumClassic',
+                      help='layout name (default %default)')
+    parser.add_option('-m', '--moves', dest='moves', type='int', default=10,
+                      help='number of moves to time (default %default)')
+    options, _ = parser.parse_args()
+
+    agentType = pacman.loadAgent(options.pacman, True)
+    agent = agentType(**pacman.parseAgentArgs(options.agentArgs))
+    gameLayout = layout.getLayout(options.layout)
+    if gameLayout == None:
+        raise Exception('The layout ' + options.layout + ' cannot be found')
+    print('%s (%s) on %s' % (options.pacman, options.agentArgs, options.layout))
+    runBench(agent, gameLayout, options.moves)
@@ -0,0 +1,66 @@
+# compareSearches.py
+# ------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Compares search functions from search.py on PositionSearchProblems (from
+Pacman's start to (1,1)) for a handful of layouts, printing plan cost, nodes
+expanded and wall time for each.
+
+> python compareSearches.py
+> python compareSearches.py -l bigMaze,openMaze -f astar:manhattanHeuristic,jps
+"""
+
+import time
+import layout
+import pacman
+import search
+import searchAgents
+
+
+def parseSearch(spec):
+    "Turns 'fn' or 'fn:heuristic' into a (name, function of a problem) pair"
+    if ':' in spec:
+        fnName, heuristicName = spec.split(':')
+        heuristic = getattr(searchAgents, heuristicName, None) or getattr(search, heuristicName)
+        fn = getattr(search, fnName)
+        return spec, lambda problem: fn(problem, heuristic)
+    return spec, getattr(search, spec)
+
+
+def compare(layoutNames, searchSpecs):
+    print('%-14s %-40s %8s %10s %9s' % ('layout', 'search', 'cost', 'expanded', 'seconds'))
+    for layoutName in layoutNames:
+        lay = layout.getLayout(layoutName)
+        gameState = pacman.GameState()
+        gameState.initialize(lay, 0)
+        for spec in searchSpecs:
+            name, fn = parseSearch(spec)
+            problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+            start = time.perf_counter()
+            plan = fn(problem)
+            elapsed = time.perf_counter() - start
+            cost = 'failed' if plan is None else problem.getCostOfActions(plan)
+            print('%-14s %-40s %8s %10d %9.4f' % (layoutName, name, cost, problem._expanded, elapsed))
+
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser(description='Compare node expansions of search functions on maze layouts')
+    parser.add_option('-l', '--layouts', dest='layouts', default='bigMaze,openMaze,contoursMaze',
+                      help='comma separated layout names (default %default)')
+    parser.add_option('-f', '--searches', dest='searches',
+                      default='bfs,bibfs,astar:manhattanHeuristic,biastar:manhattanHeuristic,jps',
+                      help='comma separated fn or fn:heuristic entries (default %default)')
+    options, _ = parser.parse_args()
+    compare(options.layouts.split(','), options.searches.split(','))
@@ -13,7 +13,46 @@
 
 
 import search
+import util
 import random
+import os
+
+# Board tables
+
+_boardTables = {}
+
+def getBoardTables(width):
+    """
+      Returns the precomputed tables for a width x width sliding puzzle whose
+    goal has tile t in cell t (the blank, 0, in the top left corner):
+
+      moves:      moves[cell] is a tuple of (move, newBlankCell) pairs for a
+                  blank in cell, in the order 'up', 'down', 'left', 'right'
+      manhattan:  manhattan[tile][cell] is the Manhattan distance from cell to
+                  the goal cell of tile (0 for the blank)
+      goal:       the goal as a tuple of numbers
+
+    The tables are built once per width.
+    """
+    if width not in _boardTables:
+        numCells = width * width
+        moves = []
+        for cell in range(numCells):
+            row, col = divmod(cell, width)
+            cellMoves = []
+            if row != 0:
+                cellMoves.append(('up', cell - width))
+            if row != width - 1:
+                cellMoves.append(('down', cell + width))
+            if col != 0:
+                cellMoves.append(('left', cell - 1))
+            if col != width - 1:
+                cellMoves.append(('right', cell + 1))
+            moves.append(tuple(cellMoves))
+        manhattan = [[0] * numCells] + [[abs(cell // width - tile // width) + abs(cell % width - tile % width)
+                                         for cell in range(numCells)] for tile in range(1, numCells)]
+        _boardTables[width] = (tuple(moves), manhattan, tuple(range(numCells)))
+    return _boardTables[width]
 
 # Module Classes
 
@@ -25,8 +64,14 @@ class EightPuzzleState:
     This class defines the mechanics of the puzzle itself.  The
     task of recasting this puzzle as a search problem is left to
     the EightPuzzleSearchProblem class.
+
+    States are immutable: the numbers are kept as a tuple read row by row,
+    with the index of the blank, and the moves available from each blank
+    cell come from the precomputed tables of getBoardTables.
     """
 
+    width = 3
+
     def __init__( self, numbers ):
         """
           Constructs a new eight puzzle from an ordering of numbers.
@@ -46,18 +91,30 @@ class EightPuzzleState:
             | 6 | 7 | 8 |
             ------------
 
-        The configuration of the puzzle is stored in a 2-dimensional
-        list (a list of lists) 'cells'.
+        The configuration of the puzzle is stored in the tuple 'numbers';
+        'cells' gives it as a 2-dimensional list (a list of lists).
         """
-        self.cells = []
-        numbers = numbers[:] # Make a copy so as not to cause side-effects.
-        numbers.reverse()
-        for row in range( 3 ):
-            self.cells.append( [] )
-            for col in range( 3 ):
-                self.cells[row].append( numbers.pop() )
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
+        self.numbers = tuple(numbers)
+        self.blank = self.numbers.index(0)
+        self.hash = hash(self.numbers)
+
+    def _successor(self, numbers, blank):
+        "Builds the state of the same class for numbers without searching for the blank"
+        state = self.__class__.__new__(self.__class__)
+        state.numbers = numbers
+        state.blank = blank
+        state.width = self.width
+        state.hash = hash(numbers)
+        return state
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, self.width)
+
+    @property
+    def cells(self):
+        width = self.width
+        return [list(self.numbers[row * width:(row + 1) * width]) for row in range(width)]
 
     def isGoal( self ):
         """
@@ -77,13 +134,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).isGoal()
         False
         """
-        current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
-                if current != self.cells[row][col]:
-                    return False
-                current += 1
-        return True
+        return self.numbers == getBoardTables(self.width)[2]
 
     def legalMoves( self ):
         """
@@ -95,17 +146,20 @@ class EightPuzzleState:
         >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
         ['down', 'right']
         """
-        moves = []
-        row, col = self.blankLocation
-        if(row != 0):
-            moves.append('up')
-        if(row != 2):
-            moves.append('down')
-        if(col != 0):
-            moves.append('left')
-        if(col != 2):
-            moves.append('right')
-        return moves
+        return [move for move, _ in getBoardTables(self.width)[0][self.blank]]
+
+    def results(self):
+        """
+          Returns a list of (move, successor) pairs for every legal move, in
+        the order of legalMoves.
+        """
+        numbers, blank = self.numbers, self.blank
+        successors = []
+        for move, target in getBoardTables(self.width)[0][blank]:
+            newNumbers = list(numbers)
+            newNumbers[blank], newNumbers[target] = numbers[target], 0
+            successors.append((move, self._successor(tuple(newNumbers), target)))
+        return successors
 
     def result(self, move):
         """
@@ -113,37 +167,17 @@ class EightPuzzleState:
         updated based on the provided move.
 
         The move should be a string drawn from a list returned by legalMoves.
-        Illegal moves will raise an exception, which may be an array bounds
-        exception.
+        Illegal moves will raise an exception.
 
         NOTE: This function *does not* change the current object.  Instead,
         it returns a new object.
         """
-        row, col = self.blankLocation
-        if(move == 'up'):
-            newrow = row - 1
-            newcol = col
-        elif(move == 'down'):
-            newrow = row + 1
-            newcol = col
-        elif(move == 'left'):
-            newrow = row
-            newcol = col - 1
-        elif(move == 'right'):
-            newrow = row
-            newcol = col + 1
-        else:
-            raise "Illegal Move"
-
-        # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
-        newPuzzle.cells = [values[:] for values in self.cells]
-        # And update it to reflect the move
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
-        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
-
-        return newPuzzle
+        for legalMove, target in getBoardTables(self.width)[0][self.blank]:
+            if legalMove == move:
+                newNumbers = list(self.numbers)
+                newNumbers[self.blank], newNumbers[target] = self.numbers[target], 0
+                return self._successor(tuple(newNumbers), target)
+        raise Exception('Illegal Move: ' + str(move))
 
     # Utilities for comparison and display
     def __eq__(self, other):
@@ -155,27 +189,25 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        return self.numbers == other.numbers
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return self.hash
 
     def __getAsciiString(self):
         """
           Returns a display string for the maze
         """
+        cellWidth = len(str(len(self.numbers) - 1))
         lines = []
-        horizontalLine = ('-' * (13))
+        horizontalLine = ('-' * ((cellWidth + 3) * self.width + 1))
         lines.append(horizontalLine)
         for row in self.cells:
             rowLine = '|'
             for col in row:
                 if col == 0:
                     col = ' '
-                rowLine = rowLine + ' ' + col.__str__() + ' |'
+                rowLine = rowLine + ' ' + col.__str__().rjust(cellWidth) + ' |'
             lines.append(rowLine)
             lines.append(horizontalLine)
         return '\n'.join(lines)
@@ -183,20 +215,35 @@ class EightPuzzleState:
     def __str__(self):
         return self.__getAsciiString()
 
-# TODO: Implement The methods in this class
+class NPuzzleState(EightPuzzleState):
+    """
+    A width x width sliding puzzle (the 15-puzzle for width 4, the 24-puzzle
+    for width 5) with the mechanics of EightPuzzleState.  The width follows
+    from the number of numbers; the goal again has tile t in cell t.
+    """
+
+    def __init__(self, numbers):
+        EightPuzzleState.__init__(self, numbers)
+        self.width = int(round(len(self.numbers) ** 0.5))
+        if self.width * self.width != len(self.numbers) or sorted(self.numbers) != list(range(len(self.numbers))):
+            raise Exception('Not a square sliding puzzle: ' + str(numbers))
 
 class EightPuzzleSearchProblem(search.SearchProblem):
     """
       Implementation of a SearchProblem for the  Eight Puzzle domain
 
       Each state is represented by an instance of an eightPuzzle.
+
+      patternDatabases is an optional list of PatternDatabase objects for
+      patternDatabaseHeuristic (see eightPuzzlePatternDatabases).
     """
-    def __init__(self,puzzle):
+    def __init__(self, puzzle, patternDatabases=None):
         "Creates a new EightPuzzleSearchProblem which stores search information."
         self.puzzle = puzzle
+        self.patternDatabases = patternDatabases or []
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -207,10 +254,7 @@ class EightPuzzleSearchProblem(search.SearchProblem):
           each succesor is either left, right, up, or down
           from the original state and the cost is 1.0 for each
         """
-        succ = []
-        for a in state.legalMoves():
-            succ.append((state.result(a), a, 1))
-        return succ
+        return [(successor, move, 1) for move, successor in state.results()]
 
     def getCostOfActions(self, actions):
         """
@@ -221,6 +265,258 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         """
         return len(actions)
 
+class NPuzzleSearchProblem(EightPuzzleSearchProblem):
+    """
+      An EightPuzzleSearchProblem for an NPuzzleState of any width.
+
+      patternDatabases is an optional list of AdditivePatternDatabase objects
+      over disjoint tiles for additivePatternHeuristic (see
+      getAdditivePatternDatabases).
+    """
+
+# Heuristics (usable with search.aStarSearch on any square puzzle state)
+
+def manhattanHeuristic(state, problem=None):
+    "The sum of the Manhattan distances of the tiles from their goal cells"
+    manhattan = getBoardTables(state.width)[1]
+    return sum([manhattan[tile][cell] for cell, tile in enumerate(state.numbers)])
+
+def linearConflictHeuristic(state, problem=None):
+    """
+      Manhattan distance plus linear conflicts: when tiles that are in their
+    goal row (or column) appear in the wrong order, all but the longest run
+    in the right order must leave the line and come back, two extra moves
+    each.
+    """
+    width, numbers = state.width, state.numbers
+    cost = manhattanHeuristic(state)
+    for line in range(width):
+        # Goal columns of the tiles in their goal row, left to right, and goal
+        # rows of the tiles in their goal column, top to bottom
+        rowTiles = [tile % width for tile in numbers[line * width:(line + 1) * width]
+                    if tile != 0 and tile // width == line]
+        colTiles = [tile // width for tile in numbers[line::width] if tile != 0 and tile % width == line]
+        for goals in (rowTiles, colTiles):
+            if len(goals) > 1:
+                cost += 2 * (len(goals) - _longestIncreasingRun(goals))
+    return cost
+
+def _longestIncreasingRun(values):
+    "Length of the longest increasing subsequence of a short list"
+    best = [1] * len(values)
+    for i in range(len(values)):
+        for j in range(i):
+            if values[j] < values[i] and best[j] + 1 > best[i]:
+                best[i] = best[j] + 1
+    return max(best)
+
+class PatternDatabase:
+    """
+      Exact solution lengths of an abstraction of a width x width puzzle in
+    which only the tiles in pattern and the blank are told apart; every other
+    tile is interchangeable.  Any solution of the puzzle solves the
+    abstraction, so the stored lengths are admissible and consistent.
+
+    The table is a bytearray indexed by the cells of the pattern tiles and the
+    blank, packed in base width*width, and is filled by a breadth first search
+    back from the goal.
+    """
+
+    def __init__(self, width, pattern):
+        self.width = width
+        self.pattern = tuple(pattern)
+        self.table = self._build()
+
+    def index(self, numbers):
+        "Returns the table index of the puzzle with these numbers"
+        numCells = self.width * self.width
+        index = numbers.index(0)
+        for tile in reversed(self.pattern):
+            index = index * numCells + numbers.index(tile)
+        return index
+
+    def lookup(self, state):
+        return self.table[self.index(state.numbers)]
+
+    def _build(self):
+        numCells = self.width * self.width
+        moves = getBoardTables(self.width)[0]
+        numPlaces = len(self.pattern) + 1
+        table = bytearray([255]) * (numCells ** numPlaces)
+
+        def pack(places):
+            index = 0
+            for place in reversed(places):
+                index = index * numCells + place
+            return index
+
+        # places lists the cell of each pattern tile, then of the blank
+        goal = tuple(self.pattern) + (0,)
+        table[pack(goal)] = 0
+        frontier = [goal]
+        depth = 0
+        while frontier:
+            depth += 1
+            nextFrontier = []
+            for places in frontier:
+                blank = places[-1]
+                for _, target in moves[blank]:
+                    nextPlaces = list(places)
+                    if target in places:
+                        nextPlaces[places.index(target)] = blank
+                    nextPlaces[-1] = target
+                    index = pack(nextPlaces)
+                    if table[index] == 255:
+                        table[index] = depth
+                        nextFrontier.append(tuple(nextPlaces))
+            frontier = nextFrontier
+        return table
+
+def patternDatabaseHeuristic(state, problem):
+    """
+      The largest of linearConflictHeuristic and the pattern database values
+    for problem.patternDatabases.
+    """
+    numbers = state.numbers
+    return max([linearConflictHeuristic(state)] +
+               [database.table[database.index(numbers)] for database in problem.patternDatabases])
+
+class AdditivePatternDatabase:
+    """
+      Like PatternDatabase, but only the moves of the tiles in pattern are
+    counted and the blank is abstracted away, so the values of databases over
+    disjoint sets of tiles can be added and still be admissible.
+
+    The table is a bytearray indexed by the cells of the pattern tiles packed
+    in base width*width.  It is filled by a breadth first search over costs:
+    within a placement of the pattern tiles the blank moves for free, so each
+    search node is a placement with the region of cells the blank can reach.
+    A 4 tile table takes seconds to build, and the three 5 tile tables of the
+    15-puzzle's 5-5-5 partition take about 40 seconds together, so tables
+    are saved in cacheDir and loaded from there when present.
+    """
+
+    def __init__(self, width, pattern, cacheDir=None):
+        self.width = width
+        self.pattern = tuple(pattern)
+        self.cacheFile = None
+        if cacheDir is not None:
+            name = 'puzzle%d-%s.pdb' % (width, '-'.join([str(tile) for tile in self.pattern]))
+            self.cacheFile = os.path.join(cacheDir, name)
+        self.table = self._load()
+        if self.table is None:
+            self.table = self._build()
+            self._save()
+
+    def lookup(self, positions):
+        "Returns the value for a puzzle where positions[tile] is the cell of each tile"
+        numCells = self.width * self.width
+        index = 0
+        for tile in self.pattern:
+            index = index * numCells + positions[tile]
+        return self.table[index]
+
+    def _build(self):
+        numCells = self.width * self.width
+        neighbors = [tuple([target for _, target in cellMoves]) for cellMoves in getBoardTables(self.width)[0]]
+        table = bytearray([255]) * (numCells ** len(self.pattern))
+        reached = {}  # index -> bitmask of the blank cells reached with that placement
+
+        def pack(places):
+            index = 0
+            for place in places:
+                index = index * numCells + place
+            return index
+
+        def blankRegion(places, start):
+            region = 1 << start
+            stack = [start]
+            while stack:
+                cell = stack.pop()
+                for nextCell in neighbors[cell]:
+                    if not region >> nextCell & 1 and nextCell not in places:
+                        region |= 1 << nextCell
+                        stack.append(nextCell)
+            return region
+
+        goal = self.pattern
+        region = blankRegion(goal, 0)
+        table[pack(goal)] = 0
+        reached[pack(goal)] = region
+        frontier = [(goal, region)]
+        depth = 0
+        while frontier:
+            depth += 1
+            nextFrontier = []
+            for places, region in frontier:
+                # Slide any pattern tile next to the blank's region into it
+                for i, cell in enumerate(places):
+                    for target in neighbors[cell]:
+                        if not region >> target & 1:
+                            continue
+                        nextPlaces = places[:i] + (target,) + places[i + 1:]
+                        index = pack(nextPlaces)
+                        known = reached.get(index, 0)
+                        if known >> cell & 1:
+                            continue
+                        nextRegion = blankRegion(nextPlaces, cell)
+                        reached[index] = known | nextRegion
+                        if table[index] == 255:
+                            table[index] = depth
+                        nextFrontier.append((nextPlaces, nextRegion))
+            frontier = nextFrontier
+        return table
+
+    def _load(self):
+        if self.cacheFile is None:
+            return None
+        data = util.readCacheFile(self.cacheFile)
+        if data is None or len(data) != (self.width * self.width) ** len(self.pattern):
+            return None
+        return bytearray(data)
+
+    def _save(self):
+        if self.cacheFile is not None:
+            util.writeCacheFile(self.cacheFile, self.table)
+
+def additivePatternHeuristic(state, problem):
+    "The sum of the values of the disjoint problem.patternDatabases (AdditivePatternDatabase objects)"
+    positions = [0] * len(state.numbers)
+    for cell, tile in enumerate(state.numbers):
+        positions[tile] = cell
+    return sum([database.lookup(positions) for database in problem.patternDatabases])
+
+PATTERN_DATABASE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'patternDatabaseCache')
+
+def defaultPartition(width):
+    """
+      Splits the tiles of a width x width puzzle, in row order, into groups
+    small enough for AdditivePatternDatabase: five tiles for the 15-puzzle
+    (a 5-5-5 partition) and four otherwise.
+    """
+    size = 5 if width == 4 else 4
+    tiles = list(range(1, width * width))
+    return [tuple(tiles[i:i + size]) for i in range(0, len(tiles), size)]
+
+_additivePatternDatabases = {}
+
+def getAdditivePatternDatabases(width, partition=None, cacheDir=PATTERN_DATABASE_CACHE_DIR):
+    "Returns (building or loading them on first use) the AdditivePatternDatabases of a partition of the tiles"
+    if partition is None:
+        partition = defaultPartition(width)
+    key = (width, tuple([tuple(pattern) for pattern in partition]))
+    if key not in _additivePatternDatabases:
+        _additivePatternDatabases[key] = [AdditivePatternDatabase(width, pattern, cacheDir) for pattern in partition]
+    return _additivePatternDatabases[key]
+
+_eightPuzzlePatternDatabases = []
+
+def eightPuzzlePatternDatabases():
+    "Returns pattern databases for tiles 1-4 and 5-8 of the eight puzzle, built on first use"
+    if not _eightPuzzlePatternDatabases:
+        _eightPuzzlePatternDatabases.extend([PatternDatabase(3, (1, 2, 3, 4)), PatternDatabase(3, (5, 6, 7, 8))])
+    return _eightPuzzlePatternDatabases
+
 EIGHT_PUZZLE_DATA = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
                      [1, 7, 8, 2, 3, 4, 5, 6, 0],
                      [4, 3, 2, 7, 0, 5, 1, 6, 8],
@@ -262,14 +558,54 @@ def createRandomEightPuzzle(moves=100):
         puzzle = puzzle.result(random.sample(puzzle.legalMoves(), 1)[0])
     return puzzle
 
+def createRandomPuzzle(width=4, moves=100):
+    """
+      Creates a random NPuzzleState by applying 'moves' random moves to a
+    solved width x width puzzle, never undoing the previous move.
+    """
+    puzzle = NPuzzleState(range(width * width))
+    previous = None
+    for i in range(moves):
+        choices = [(move, successor) for move, successor in puzzle.results() if successor.blank != previous]
+        previous = puzzle.blank
+        puzzle = random.choice(choices)[1]
+    return puzzle
+
+def solveRandomPuzzles(width, count, moves):
+    "Solves count random puzzles with IDA* and the default additive pattern databases, printing each result"
+    import time
+    start = time.time()
+    databases = getAdditivePatternDatabases(width)
+    print('Pattern databases for %s ready in %.1f seconds' % (defaultPartition(width), time.time() - start))
+    for i in range(count):
+        puzzle = createRandomPuzzle(width, moves)
+        problem = NPuzzleSearchProblem(puzzle, databases)
+        start = time.time()
+        path = search.iterativeDeepeningAStarSearch(problem, additivePatternHeuristic)
+        print('Puzzle %d: %d moves, h = %d, %s, %.2f seconds' %
+              (i, len(path), additivePatternHeuristic(puzzle, problem), problem._searchStats, time.time() - start))
+
 if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser(description='Step through an eight puzzle solution, or solve random N-puzzles with IDA*')
+    parser.add_option('-w', '--width', dest='width', type='int', default=3,
+                      help='board width; widths other than 3 solve random puzzles (default %default)')
+    parser.add_option('-n', '--numPuzzles', dest='numPuzzles', type='int', default=5,
+                      help='number of random puzzles to solve (default %default)')
+    parser.add_option('-m', '--moves', dest='moves', type='int', default=60,
+                      help='random moves used to shuffle each puzzle (default %default)')
+    options, _ = parser.parse_args()
+    if options.width != 3:
+        solveRandomPuzzles(options.width, options.numPuzzles, options.moves)
+        raise SystemExit
+
     puzzle = createRandomEightPuzzle(25)
     print('A random puzzle:')
     print(puzzle)
 
     problem = EightPuzzleSearchProblem(puzzle)
-    path = search.breadthFirstSearch(problem)
-    print('BFS found a path of %d moves: %s' % (len(path), str(path)))
+    path = search.aStarSearch(problem, linearConflictHeuristic)
+    print('A* found a path of %d moves: %s' % (len(path), str(path)))
     curr = puzzle
     i = 1
     for a in path:
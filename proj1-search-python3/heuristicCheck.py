@@ -0,0 +1,226 @@
+# heuristicCheck.py
+# -----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Checks a heuristic for admissibility and consistency on every reachable state
+of a search problem, rather than on the few states the autograder samples.
+
+The reachable state space is explored once from the start state, with every
+state numbered so the graph is kept as flat arrays of state numbers.  The
+exact cost to go of every state is then computed by Dijkstra's algorithm run
+backwards from all goal states, and the heuristic is evaluated on every state
+by a pool of worker processes.
+
+> python heuristicCheck.py -l trickySearch -p FoodSearchProblem -H foodHeuristic
+> python heuristicCheck.py -l bigCorners -p CornersProblem -H cornersHeuristic -j 4
+"""
+
+import array
+import heapq
+import pickle
+import time
+import layout
+import pacman
+import search
+import searchAgents
+
+EPSILON = 1e-9
+
+
+def exploreStateSpace(problem, maxStates=None):
+    """
+    Numbers every state reachable from the start of problem (breadth first, up
+    to maxStates states) and returns (states, goals, sources, targets, costs,
+    complete): states lists the states by number, goals the numbers of the
+    goal states, the three arrays hold one edge (source, target, step cost)
+    per successor, and complete is False if maxStates cut the search short.
+    """
+    start = problem.getStartState()
+    numbers = {start: 0}
+    states = [start]
+    goals = []
+    sources, targets, costs = array.array('i'), array.array('i'), array.array('d')
+    complete = True
+    current = 0
+    while current < len(states):
+        state = states[current]
+        if problem.isGoalState(state):
+            goals.append(current)
+        for child, _, stepCost in problem.getSuccessors(state):
+            number = numbers.get(child)
+            if number is None:
+                if maxStates is not None and len(states) >= maxStates:
+                    complete = False
+                    continue
+                number = numbers[child] = len(states)
+                states.append(child)
+            sources.append(current)
+            targets.append(number)
+            costs.append(stepCost)
+        current += 1
+    return states, goals, sources, targets, costs, complete
+
+
+def costsToGo(numStates, goals, sources, targets, costs):
+    "Returns an array of the exact cost from every state to its nearest goal (inf if none is reachable)"
+    # Incoming edges of each state, grouped by target (a counting sort)
+    firstEdge = array.array('i', [0]) * (numStates + 1)
+    for target in targets:
+        firstEdge[target + 1] += 1
+    for i in range(numStates):
+        firstEdge[i + 1] += firstEdge[i]
+    incoming = array.array('i', [0]) * len(targets)
+    filled = array.array('i', firstEdge)
+    for edge, target in enumerate(targets):
+        incoming[filled[target]] = edge
+        filled[target] += 1
+
+    distances = array.array('d', [float('inf')]) * numStates
+    heap = []
+    for goal in goals:
+        distances[goal] = 0
+        heap.append((0, goal))
+    heapq.heapify(heap)
+    while heap:
+        distance, state = heapq.heappop(heap)
+        if distance > distances[state]:
+            continue
+        for i in range(firstEdge[state], firstEdge[state + 1]):
+            edge = incoming[i]
+            source = sources[edge]
+            if distance + costs[edge] < distances[source]:
+                distances[source] = distance + costs[edge]
+                heapq.heappush(heap, (distances[source], source))
+    return distances
+
+
+_workerProblem, _workerHeuristic = None, None
+
+
+def _initWorker(problem, heuristic):
+    global _workerProblem, _workerHeuristic
+    _workerProblem, _workerHeuristic = problem, heuristic
+
+
+def _evaluateChunk(states):
+    return [_workerHeuristic(state, _workerProblem) for state in states]
+
+
+def evaluateHeuristic(problem, heuristic, states, workers=None, chunkSize=2000):
+    """
+    Returns an array of heuristic(state, problem) for every state, computed in
+    a pool of worker processes that each hold their own copy of problem (and
+    so of problem.heuristicInfo).  workers=1 evaluates in this process, as
+    does any problem that cannot be pickled (a PositionSearchProblem's costFn
+    is a lambda) when workers are not started by fork.
+    """
+    import multiprocessing
+    if workers != 1 and multiprocessing.get_start_method() != 'fork':
+        try:
+            pickle.dumps((problem, heuristic))
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            print('Evaluating the heuristic in this process: %s' % e)
+            workers = 1
+    if workers == 1:
+        return array.array('d', [heuristic(state, problem) for state in states])
+    import concurrent.futures
+    chunks = [states[i:i + chunkSize] for i in range(0, len(states), chunkSize)]
+    values = array.array('d')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_initWorker,
+                                                initargs=(problem, heuristic)) as executor:
+        for chunkValues in executor.map(_evaluateChunk, chunks):
+            values.extend(chunkValues)
+    return values
+
+
+def checkHeuristic(problem, heuristic, workers=None, maxStates=None, maxReports=5):
+    """
+    Checks heuristic on every reachable state of problem, printing a summary
+    and up to maxReports examples of each kind of violation, and returns a
+    dictionary of the violation counts.  Admissibility is only checked when
+    the whole state space fits in maxStates, since the costs to go of a
+    partial space are not exact.
+    """
+    start = time.time()
+    states, goals, sources, targets, costs, complete = exploreStateSpace(problem, maxStates)
+    print('%d states, %d goal states, %d edges%s (%.1f seconds)' %
+          (len(states), len(goals), len(targets), '' if complete else ' (truncated)', time.time() - start))
+    start = time.time()
+    values = evaluateHeuristic(problem, heuristic, states, workers)
+    print('Heuristic evaluated in %.1f seconds' % (time.time() - start))
+
+    report = {'states': len(states), 'inadmissible': 0, 'inconsistent': 0, 'nonzeroGoals': 0, 'negative': 0}
+    for goal in goals:
+        if values[goal] != 0:
+            report['nonzeroGoals'] += 1
+            if report['nonzeroGoals'] <= maxReports:
+                print('Goal state with heuristic %s: %s' % (values[goal], states[goal]))
+    for number, value in enumerate(values):
+        if value < 0:
+            report['negative'] += 1
+            if report['negative'] <= maxReports:
+                print('Negative heuristic %s: %s' % (value, states[number]))
+
+    if complete:
+        start = time.time()
+        distances = costsToGo(len(states), goals, sources, targets, costs)
+        print('Costs to go computed in %.1f seconds' % (time.time() - start))
+        for number, value in enumerate(values):
+            if value > distances[number] + EPSILON:
+                report['inadmissible'] += 1
+                if report['inadmissible'] <= maxReports:
+                    print('Inadmissible: h = %s > %s for %s' % (value, distances[number], states[number]))
+    else:
+        print('Admissibility not checked: the state space is larger than %d states' % maxStates)
+
+    for edge in range(len(targets)):
+        source, target = sources[edge], targets[edge]
+        if values[source] - values[target] > costs[edge] + EPSILON:
+            report['inconsistent'] += 1
+            if report['inconsistent'] <= maxReports:
+                print('Inconsistent: h = %s, then %s after a step of cost %s, from %s to %s' %
+                      (values[source], values[target], costs[edge], states[source], states[target]))
+
+    print('%(inadmissible)d inadmissible, %(inconsistent)d inconsistent, %(nonzeroGoals)d nonzero goal '
+          'and %(negative)d negative heuristic values' % report)
+    return report
+
+
+def makeProblem(problemName, layoutName):
+    "Builds the searchAgents problem named problemName for the start of a layout"
+    gameState = pacman.GameState()
+    gameState.initialize(layout.getLayout(layoutName), 0)
+    problemType = getattr(searchAgents, problemName)
+    if problemType is searchAgents.PositionSearchProblem:
+        return problemType(gameState, warn=False, visualize=False)
+    return problemType(gameState)
+
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser(description='Check a heuristic on every reachable state of a search problem')
+    parser.add_option('-l', '--layout', dest='layout', default='trickySearch',
+                      help='layout name (default %default)')
+    parser.add_option('-p', '--problem', dest='problem', default='FoodSearchProblem',
+                      help='problem type in searchAgents.py (default %default)')
+    parser.add_option('-H', '--heuristic', dest='heuristic', default='foodHeuristic',
+                      help='heuristic in searchAgents.py or search.py (default %default)')
+    parser.add_option('-j', '--workers', dest='workers', type='int', default=None,
+                      help='number of worker processes (default: one per CPU)')
+    parser.add_option('-m', '--maxStates', dest='maxStates', type='int', default=2000000,
+                      help='largest state space to explore (default %default)')
+    options, _ = parser.parse_args()
+
+    heuristic = getattr(searchAgents, options.heuristic, None) or getattr(search, options.heuristic)
+    checkHeuristic(makeProblem(options.problem, options.layout), heuristic, options.workers, options.maxStates)
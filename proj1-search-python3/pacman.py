@@ -71,14 +71,31 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
-    explored = set()
+    # static variable keeps track of which states have had successors generated
+    # (None, the default, turns the tracking off)
+    explored = None
     def getAndResetExplored():
-        tmp = GameState.explored.copy()
+        """
+        Returns the states recorded since the last call and starts recording
+        into a new set.  If tracking is off it stays off and an empty set is
+        returned.
+        """
+        tmp = GameState.explored
+        if tmp is None:
+            return set()
         GameState.explored = set()
         return tmp
     getAndResetExplored = staticmethod(getAndResetExplored)
 
+    def setExploredTracker(tracker):
+        """
+        Records every state that generates a successor, and the successor, by
+        calling tracker.add(state).  tracker can be a set, any other object
+        with an add method, or None to turn the tracking off.
+        """
+        GameState.explored = tracker
+    setExploredTracker = staticmethod(setExploredTracker)
+
     def getLegalActions( self, agentIndex=0 ):
         """
         Returns the legal actions for the agent specified.
@@ -98,12 +115,13 @@ class GameState:
         # Check that successors exist
         if self.isWin() or self.isLose(): raise Exception('Can\'t generate a successor of a terminal state.')
 
-        # Copy current state
+        # Copy current state (the rules copy whatever they change)
         state = GameState(self)
 
         # Let agent's logic deal with its action's effects on the board
         if agentIndex == 0:  # Pacman is moving
-            state.data._eaten = [False for i in range(state.getNumAgents())]
+            if True in state.data._eaten:
+                state.data._eaten = [False for i in range(state.getNumAgents())]
             PacmanRules.applyAction( state, action )
         else:                # A ghost is moving
             GhostRules.applyAction( state, action, agentIndex )
@@ -118,10 +136,12 @@ class GameState:
         GhostRules.checkDeath( state, agentIndex )
 
         # Book keeping
+        state.data.updateHash( self.data )
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.explored is not None:
+            GameState.explored.add(self)
+            GameState.explored.add(state)
         return state
 
     def getLegalPacmanActions( self ):
@@ -146,9 +166,18 @@ class GameState:
         return self.data.agentStates[0].getPosition()
 
     def getGhostStates( self ):
+        """
+        Returns a list of the AgentState objects of the ghosts.  The AgentStates
+        are shared with sibling and successor states, so they must not be
+        modified.
+        """
         return self.data.agentStates[1:]
 
     def getGhostState( self, agentIndex ):
+        """
+        Returns the AgentState of a ghost, shared with other states like those
+        of getGhostStates, so it must not be modified.
+        """
         if agentIndex == 0 or agentIndex >= self.getNumAgents():
             raise Exception("Invalid index passed to getGhostState")
         return self.data.agentStates[agentIndex]
@@ -169,12 +198,22 @@ class GameState:
 
     def getCapsules(self):
         """
-        Returns a list of positions (x,y) of the remaining capsules.
+        Returns a list of positions (x,y) of the remaining capsules.  The list
+        is shared with sibling and successor states, so it must not be
+        modified.
         """
         return self.data.capsules
 
     def getNumFood( self ):
-        return self.data.food.count()
+        return self.data._numFood
+
+    def getFoodPositions( self ):
+        """
+        Returns a frozenset of the (x,y) positions of the remaining food.  It
+        is kept up to date as food is eaten, so it is cheaper than
+        getFood().asList().
+        """
+        return self.data.foodPositions()
 
     def getFood(self):
         """
@@ -331,7 +370,7 @@ class PacmanRules:
         """
         Returns a list of possible actions.
         """
-        return Actions.getPossibleActions( state.getPacmanState().configuration, state.data.layout.walls )
+        return Actions.getPossibleActions( state.data.agentStates[0].configuration, state.data.layout.walls )
     getLegalActions = staticmethod( getLegalActions )
 
     def applyAction( state, action ):
@@ -342,7 +381,7 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[0]
+        pacmanState = state.data.copyAgentState( 0 )
 
         # Update Configuration
         vector = Actions.directionToVector( action, PacmanRules.PACMAN_SPEED )
@@ -361,21 +400,19 @@ class PacmanRules:
         # Eat food
         if state.data.food[x][y]:
             state.data.scoreChange += 10
-            state.data.food = state.data.food.copy()
-            state.data.food[x][y] = False
+            state.data.eatFood( x, y )
             state.data._foodEaten = position
-            # TODO: cache numFood?
             numFood = state.getNumFood()
             if numFood == 0 and not state.data._lose:
                 state.data.scoreChange += 500
                 state.data._win = True
         # Eat capsule
         if( position in state.getCapsules() ):
-            state.data.capsules.remove( position )
+            state.data.eatCapsule( position )
             state.data._capsuleEaten = position
             # Reset all ghosts' scared timers
             for index in range( 1, len( state.data.agentStates ) ):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.copyAgentState( index ).scaredTimer = SCARED_TIME
     consume = staticmethod( consume )
 
 class GhostRules:
@@ -404,7 +441,7 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data.copyAgentState( ghostIndex )
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0: speed /= 2.0
         vector = Actions.directionToVector( action, speed )
@@ -425,7 +462,7 @@ class GhostRules:
                 ghostState = state.data.agentStates[index]
                 ghostPosition = ghostState.configuration.getPosition()
                 if GhostRules.canKill( pacmanPosition, ghostPosition ):
-                    GhostRules.collide( state, ghostState, index )
+                    GhostRules.collide( state, state.data.copyAgentState( index ), index )
         else:
             ghostState = state.data.agentStates[agentIndex]
             ghostPosition = ghostState.configuration.getPosition()
@@ -439,6 +476,7 @@ class GhostRules:
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
             # Added for first-person
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
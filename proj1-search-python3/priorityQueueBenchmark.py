@@ -0,0 +1,86 @@
+# priorityQueueBenchmark.py
+# -------------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Micro-benchmark comparing util.PriorityQueue with util.IndexedPriorityQueue.
+
+Each run replays the same random sequence of update and pop calls (the mix a
+frontier-managed search produces) against every queue variant and reports the
+wall time.  The linear-scan PriorityQueue.update is quadratic overall, so it is
+skipped for operation counts above --baselineLimit.
+
+> python priorityQueueBenchmark.py
+> python priorityQueueBenchmark.py -n 10000,100000 -b 100000
+"""
+
+import random
+import time
+import util
+
+
+def makeOperations(numOps, seed=0):
+    """
+    Returns a list of (item, priority) pairs; an item of None means pop.
+    Roughly half of the updates hit an item that is already queued.
+    """
+    rand = random.Random(seed)
+    keySpace = max(1, numOps // 4)
+    operations = []
+    for i in range(numOps):
+        if rand.random() < 0.3:
+            operations.append((None, None))
+        else:
+            operations.append((rand.randrange(keySpace), rand.randrange(numOps)))
+    return operations
+
+
+def runQueue(queue, operations):
+    "Replays operations against queue and returns the elapsed seconds"
+    start = time.perf_counter()
+    for item, priority in operations:
+        if item is None:
+            if not queue.isEmpty():
+                queue.pop()
+        else:
+            queue.update(item, priority)
+    while not queue.isEmpty():
+        queue.pop()
+    return time.perf_counter() - start
+
+
+QUEUES = [('PriorityQueue', util.PriorityQueue),
+          ('IndexedPriorityQueue', util.IndexedPriorityQueue),
+          ('IndexedPriorityQueue(lazy)', lambda: util.IndexedPriorityQueue(lazy=True))]
+
+
+def runBenchmark(sizes, baselineLimit):
+    print('%-28s %12s %12s' % ('queue', 'operations', 'seconds'))
+    for numOps in sizes:
+        operations = makeOperations(numOps)
+        for name, queueType in QUEUES:
+            if queueType is util.PriorityQueue and numOps > baselineLimit:
+                print('%-28s %12d %12s' % (name, numOps, 'skipped'))
+                continue
+            print('%-28s %12d %12.3f' % (name, numOps, runQueue(queueType(), operations)))
+
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser(description='Benchmark the priority queues in util.py')
+    parser.add_option('-n', '--numOps', dest='numOps', default='10000,100000,1000000',
+                      help='comma separated operation counts (default %default)')
+    parser.add_option('-b', '--baselineLimit', dest='baselineLimit', type='int', default=10000,
+                      help='largest operation count to run the linear-scan PriorityQueue on (default %default)')
+    options, _ = parser.parse_args()
+    runBenchmark([int(n) for n in options.numOps.split(',')], options.baselineLimit)
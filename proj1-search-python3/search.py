@@ -17,6 +17,7 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import time
 import util
 
 
@@ -63,6 +64,84 @@ class SearchProblem:
         util.raiseNotDefined()
 
 
+class SearchStats:
+    """
+    Counters filled in by the search functions in this module, left on the
+    problem as problem._searchStats:
+
+      nodesGenerated  states added to the frontier (the start included)
+      nodesExpanded   states whose successors were generated
+      peakFrontier    largest frontier size seen at an expansion
+      peakClosed      largest closed (or in-memory) set size seen
+      heuristicCalls  calls made to the heuristic
+      heuristicTime   seconds spent inside the heuristic
+      wallTime        seconds from the start of the search to its return
+
+    Counters that only make sense for one algorithm (the iterations of IDA*,
+    the nodes SMA* forgot, ...) are kept in the extra dictionary.
+    """
+
+    def __init__(self, problem=None):
+        self.nodesGenerated = 0
+        self.nodesExpanded = 0
+        self.peakFrontier = 0
+        self.peakClosed = 0
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0
+        self.wallTime = 0.0
+        self.extra = {}
+        self.startTime = time.perf_counter()
+        if problem is not None:
+            problem._searchStats = self
+
+    def expand(self, frontierSize, closedSize):
+        "Counts one expansion and updates the peak frontier and closed sizes"
+        self.nodesExpanded += 1
+        if frontierSize > self.peakFrontier:
+            self.peakFrontier = frontierSize
+        if closedSize > self.peakClosed:
+            self.peakClosed = closedSize
+
+    def timeHeuristic(self, heuristic):
+        "Returns heuristic wrapped so that its calls and time are counted"
+        def timedHeuristic(*args):
+            start = time.perf_counter()
+            value = heuristic(*args)
+            self.heuristicTime += time.perf_counter() - start
+            self.heuristicCalls += 1
+            return value
+        return timedHeuristic
+
+    def done(self, plan):
+        "Records the wall time of the search and passes its plan through"
+        self.wallTime = time.perf_counter() - self.startTime
+        return plan
+
+    def asDict(self):
+        stats = {'nodesGenerated': self.nodesGenerated,
+                 'nodesExpanded': self.nodesExpanded,
+                 'peakFrontier': self.peakFrontier,
+                 'peakClosed': self.peakClosed,
+                 'heuristicCalls': self.heuristicCalls,
+                 'heuristicTime': self.heuristicTime,
+                 'wallTime': self.wallTime,
+                 'timePerExpansion': self.wallTime / self.nodesExpanded if self.nodesExpanded else 0.0}
+        stats.update(self.extra)
+        return stats
+
+    def dump(self, fileName, **fields):
+        "Writes asDict (plus any extra fields, such as the layout name) to fileName as JSON"
+        import json
+        stats = self.asDict()
+        stats.update(fields)
+        with open(fileName, 'w') as f:
+            json.dump(stats, f, indent=2, sort_keys=True)
+
+    def __str__(self):
+        return ', '.join('%s=%s' % (key, ('%.6f' % value) if isinstance(value, float) else value)
+                         for key, value in sorted(self.asDict().items()))
+
+
 def tinyMazeSearch(problem):
     """
     Returns a sequence of moves that solves tinyMaze.  For any other maze, the
@@ -74,6 +153,23 @@ def tinyMazeSearch(problem):
     return [s, s, w, s, w, w, s, w]
 
 
+def traceGoal(parents, goal):
+    """
+    Rebuilds the list of actions leading to goal from a dictionary mapping each
+    reached state to its (parent, action) pair.  States without an entry (the
+    start state) terminate the walk.
+    """
+    path = []
+
+    while True:
+        if parents.get(goal) is not None:
+            path.append(parents.get(goal)[1])
+            goal = parents.get(goal)[0]
+        else:
+            path.reverse()
+            return path
+
+
 def depthFirstSearch(problem):
     """
     Search the deepest nodes in the search tree first.
@@ -87,76 +183,66 @@ def depthFirstSearch(problem):
     print("Start:", problem.getStartState())
     print("Is the start a goal?", problem.isGoalState(problem.getStartState()))
     print("Start's successors:", problem.getSuccessors(problem.getStartState()))
+
+    The search walks an explicit stack of (state, successor iterator) frames
+    instead of recursing, so it visits states, calls getSuccessors and returns
+    the same plan as a recursive depth-first search without being bounded by
+    Python's recursion limit.  Each discovered state records a single parent
+    pointer and the plan is rebuilt once at the goal with traceGoal.
     """
+    stats = SearchStats(problem)
     marked = set([])
-    path = []
-    return recursive_DFS(problem.getStartState(), problem, marked, path)
-
-
-def recursive_DFS(v, problem, marked, path):
-    if v not in marked:
-        marked.add(v)
-        if problem.isGoalState(v):
-            return path
+    parents = {}
+
+    start = problem.getStartState()
+    marked.add(start)
+    stats.nodesGenerated += 1
+    if problem.isGoalState(start):
+        return stats.done([])
+    stack = [(start, iter(problem.getSuccessors(start)))]
+    stats.expand(1, 1)
+
+    while stack:
+        current, successors = stack[-1]
+        for child, action, _ in successors:
+            if child not in marked:
+                marked.add(child)
+                stats.nodesGenerated += 1
+                parents[child] = (current, action)
+                if problem.isGoalState(child):
+                    return stats.done(traceGoal(parents, child))
+                stack.append((child, iter(problem.getSuccessors(child))))
+                stats.expand(len(stack), len(marked))
+                break
         else:
-            for child in problem.getSuccessors(v):
-                path.append(child[1])
-                newpath = recursive_DFS(child[0], problem, marked, path)
-                if newpath:
-                    return newpath
-                else:
-                    path.pop()
-            return []
+            stack.pop()
+    return stats.done([])
 
 
 def breadthFirstSearch(problem):
     """Search the shallowest nodes in the search tree first."""
+    stats = SearchStats(problem)
     marked = set([])
     Q = util.Queue()
     Q.push((problem.getStartState(), []))
+    stats.nodesGenerated += 1
     while not Q.isEmpty():
         current, directions = Q.pop()
         if current not in marked:
             marked.add(current)
             if problem.isGoalState(current):
-                return directions
+                return stats.done(directions)
+            stats.expand(len(Q.list), len(marked))
             for child in problem.getSuccessors(current):
                 direction = directions + [child[1]]
                 Q.push((child[0], direction))
-
-
-def traceGoal(parents, goal):
-    path = []
-
-    while True:
-        if parents.get(goal) is not None:
-            path.insert(0, parents.get(goal)[1])
-            goal = parents.get(goal)[0]
-        else:
-            return path
+                stats.nodesGenerated += 1
+    return stats.done(None)
 
 
 def uniformCostSearch(problem):
     """Search the node of least total cost first."""
-    marked = set([])
-    PQ = util.PriorityQueue()
-
-    marked.add(problem.getStartState())
-    for child in problem.getSuccessors(problem.getStartState()):
-        path = [child[1]]
-        PQ.push((child[0], path), problem.getCostOfActions(path))
-
-    while not PQ.isEmpty():
-        current = PQ.pop()
-        if current[0] not in marked:
-            marked.add(current[0])
-            if problem.isGoalState(current[0]):
-                return current[1]
-            for child in problem.getSuccessors(current[0]):
-                if child[0] not in marked:
-                    temp = current[1].copy()
-                    temp.append(child[1])
-                    PQ.push((child[0], temp), problem.getCostOfActions(temp))
+    return aStarSearch(problem)
 
 
 def nullHeuristic(state, problem=None):
@@ -168,27 +254,679 @@ def nullHeuristic(state, problem=None):
 
 
 def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    Frontier entries hold (state, parent, action, g) rather than a full action
+    list; the parent pointer of a state is recorded when it is first popped and
+    the plan is rebuilt once with traceGoal when the goal is reached.  Path
+    costs are accumulated from the step costs returned by getSuccessors, so
+    getCostOfActions is never called during the search.
+    """
+    stats = SearchStats(problem)
+    heuristic = stats.timeHeuristic(heuristic)
     marked = set([])
+    parents = {}
     PQ = util.PriorityQueue()
 
-    marked.add(problem.getStartState())
-    for child in problem.getSuccessors(problem.getStartState()):
-        path = [child[1]]
-        PQ.push((child[0], path), problem.getCostOfActions(path) + heuristic(child[0], problem))
+    start = problem.getStartState()
+    PQ.push((start, None, None, 0), heuristic(start, problem))
+    stats.nodesGenerated += 1
 
     while not PQ.isEmpty():
-        current = PQ.pop()
-        if current[0] not in marked:
-            marked.add(current[0])
-            if problem.isGoalState(current[0]):
-                return current[1]
-            for child in problem.getSuccessors(current[0]):
-                if child[0] not in marked:
-                    temp = current[1].copy()
-                    temp.append(child[1])
+        current, parent, action, g = PQ.pop()
+        if current not in marked:
+            marked.add(current)
+            if parent is not None:
+                parents[current] = (parent, action)
+            if problem.isGoalState(current):
+                return stats.done(traceGoal(parents, current))
+            stats.expand(len(PQ.heap), len(marked))
+            for child, childAction, stepCost in problem.getSuccessors(current):
+                if child not in marked:
+                    childG = g + stepCost
+                    PQ.push((child, current, childAction, childG), childG + heuristic(child, problem))
+                    stats.nodesGenerated += 1
+    return stats.done(None)
+
+
+def anytimeWeightedAStarSearch(problem, heuristic=nullHeuristic, weight=3.0, weightStep=0.5, timeBudget=None):
+    """
+    Anytime Repairing A* (ARA*): weighted A* ordered by g + weight * h finds a
+    first plan quickly, then weight is lowered by weightStep and the search
+    resumes, reusing the g values found so far (states improved after being
+    expanded are queued again), until weight reaches 1 or timeBudget seconds
+    have passed.  The best plan found is returned.
+
+    After each search a proven suboptimality bound is printed: the plan cost
+    divided by the smallest g + h still on the frontier, capped at the
+    current weight.  For an admissible heuristic the plan costs at most
+    bound times the optimal cost, and a bound of 1 means it is optimal.  Only
+    a search that runs to completion proves a bound, so when timeBudget runs
+    out mid-search the bound of the last completed search is kept, or None if
+    none completed.  The improvements, as (cost, bound, seconds) triples, and
+    the final bound are kept in problem._searchStats.extra.
+    """
+    import heapq
+    stats = SearchStats(problem)
+    stats.extra = {'improvements': [], 'bound': None}
+    heuristic = stats.timeHeuristic(heuristic)
+    infinity = float('inf')
+    deadline = None if timeBudget is None else stats.startTime + float(timeBudget)
+    weight = max(float(weight), 1.0)
+
+    start = problem.getStartState()
+    stats.nodesGenerated += 1
+    if problem.isGoalState(start):
+        stats.extra['bound'] = 1.0
+        return stats.done([])
+    costs = {start: 0}
+    parents = {}
+    estimates = {start: heuristic(start, problem)}
+    bestGoal, bestCost = None, infinity
+    opened, inconsistent = set([start]), set([])
+    count = 0
+    heap = [(weight * estimates[start], count, start, 0)]
+
+    while True:
+        closed = set([])
+        # Improve the plan: expand states whose weighted f is below the best plan cost
+        while heap:
+            f, _, current, g = heap[0]
+            if current not in opened or g != costs[current]:
+                heapq.heappop(heap)
+                continue
+            if f >= bestCost or (deadline is not None and time.perf_counter() > deadline):
+                break
+            heapq.heappop(heap)
+            opened.discard(current)
+            closed.add(current)
+            stats.expand(len(opened), len(closed))
+            for child, action, stepCost in problem.getSuccessors(current):
+                childG = g + stepCost
+                if childG >= costs.get(child, infinity):
+                    continue
+                costs[child] = childG
+                parents[child] = (current, action)
+                if child not in estimates:
+                    estimates[child] = heuristic(child, problem)
+                    stats.nodesGenerated += 1
+                if problem.isGoalState(child):
+                    if childG < bestCost:
+                        bestGoal, bestCost = child, childG
+                    continue
+                if child in closed:
+                    inconsistent.add(child)
+                else:
+                    opened.add(child)
+                    count += 1
+                    heapq.heappush(heap, (childG + weight * estimates[child], count, child, childG))
+
+        timedOut = deadline is not None and time.perf_counter() > deadline
+        if bestGoal is not None:
+            previous = stats.extra['bound']
+            if timedOut:
+                # An interrupted search proves nothing; a cheaper plan still
+                # meets the bound of the last completed one
+                bound = previous
+            else:
+                lowest = min([costs[state] + estimates[state] for state in opened | inconsistent] + [bestCost])
+                bound = weight
+                if lowest > 0:
+                    bound = min(bound, bestCost / lowest)
+            improvements = stats.extra['improvements']
+            if not improvements or bestCost < improvements[-1][0] or \
+                    (bound is not None and (previous is None or bound < previous)):
+                elapsed = time.perf_counter() - stats.startTime
+                improvements.append((bestCost, bound, elapsed))
+                quality = 'with no proven bound' if bound is None else 'within %.3f of optimal' % bound
+                print('[ARA*] plan cost %s %s after %.2f seconds (weight %.2f)' %
+                      (bestCost, quality, elapsed, weight))
+            stats.extra['bound'] = bound
+        if timedOut or weight <= 1.0 or (bestGoal is None and not heap):
+            break
+
+        # Lower the weight and requeue the open and inconsistent states
+        weight = max(1.0, weight - float(weightStep))
+        opened |= inconsistent
+        inconsistent = set([])
+        heap = []
+        for state in opened:
+            count += 1
+            heap.append((costs[state] + weight * estimates[state], count, state, costs[state]))
+        heapq.heapify(heap)
+
+    if bestGoal is None:
+        return stats.done(None)
+    return stats.done(traceGoal(parents, bestGoal))
+
+
+def _goalState(problem):
+    goal = getattr(problem, 'goal', None)
+    if goal is None or not problem.isGoalState(goal):
+        raise Exception('Bidirectional search needs a problem whose single goal state is problem.goal')
+    return goal
+
+
+def _predecessorFunction(problem):
+    """
+    Returns a function giving the (predecessor, action, stepCost) triples of a
+    state, where action leads from the predecessor to the state.  Problems may
+    provide this as getPredecessors; otherwise moves are assumed to be
+    reversible with symmetric costs and are derived from getSuccessors.
+    """
+    if hasattr(problem, 'getPredecessors'):
+        return problem.getPredecessors
+    from game import Directions
 
-                    PQ.push((child[0], temp), problem.getCostOfActions(temp) + heuristic(child[0], problem))
+    def getPredecessors(state):
+        return [(pred, Directions.REVERSE[action], cost) for pred, action, cost in problem.getSuccessors(state)]
+    return getPredecessors
+
+
+def _joinPlans(forwardParents, backwardParents, meet):
+    """
+    Joins the plan from the start to meet with the plan from meet to the goal.
+    backwardParents maps a state to its (next state, action) toward the goal.
+    """
+    plan = traceGoal(forwardParents, meet)
+    while backwardParents.get(meet) is not None:
+        meet, action = backwardParents[meet]
+        plan.append(action)
+    return plan
+
+
+def bidirectionalSearch(problem):
+    """
+    Breadth first search run from the start and from problem.goal at the same
+    time, one full layer at a time on whichever side has the smaller frontier.
+    The searches stop at the first layer where they meet, which gives a
+    shortest plan when every step costs the same.
+
+    The problem must name its single goal state in problem.goal and either
+    define getPredecessors (see _predecessorFunction) or have reversible moves.
+    """
+    stats = SearchStats(problem)
+    start = problem.getStartState()
+    stats.nodesGenerated += 1
+    if problem.isGoalState(start):
+        return stats.done([])
+    goal = _goalState(problem)
+    stats.nodesGenerated += 1
+    expanders = [problem.getSuccessors, _predecessorFunction(problem)]
+    parents = [{}, {}]
+    depths = [{start: 0}, {goal: 0}]
+    frontiers = [[start], [goal]]
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        mine, other = depths[side], depths[1 - side]
+        meet, meetDepth = None, None
+        nextFrontier = []
+        for current in frontiers[side]:
+            stats.expand(len(frontiers[0]) + len(frontiers[1]) + len(nextFrontier), len(mine) + len(other))
+            for child, action, _ in expanders[side](current):
+                if child in mine:
+                    continue
+                stats.nodesGenerated += 1
+                mine[child] = mine[current] + 1
+                parents[side][child] = (current, action)
+                nextFrontier.append(child)
+                if child in other and (meet is None or other[child] < meetDepth):
+                    meet, meetDepth = child, other[child]
+        if meet is not None:
+            return stats.done(_joinPlans(parents[0], parents[1], meet))
+        frontiers[side] = nextFrontier
+    return stats.done(None)
+
+
+class _BackwardProblem:
+    """
+    Presents a problem with its start as the goal, so that heuristics written
+    against problem.goal estimate the cost back to the start.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    A* run from the start toward problem.goal and from problem.goal back
+    toward the start, always expanding the side with the smaller frontier.
+    The backward search evaluates heuristic against a view of the problem
+    whose goal is the start state.  The search stops once the best meeting
+    path found costs no more than the lower bound
+    max(f_min forward, f_min backward, g_min forward + g_min backward),
+    so the plan is optimal for admissible, consistent heuristics.
+
+    The problem must name its single goal state in problem.goal and either
+    define getPredecessors (see _predecessorFunction) or have reversible moves
+    with symmetric costs.
+    """
+    import heapq
+    stats = SearchStats(problem)
+    heuristic = stats.timeHeuristic(heuristic)
+    start = problem.getStartState()
+    stats.nodesGenerated += 1
+    if problem.isGoalState(start):
+        return stats.done([])
+    goal = _goalState(problem)
+    stats.nodesGenerated += 1
+    expanders = [problem.getSuccessors, _predecessorFunction(problem)]
+    views = [problem, _BackwardProblem(problem)]
+    costs = [{start: 0}, {goal: 0}]
+    parents = [{}, {}]
+    closed = [set([]), set([])]
+    # Lazy heaps of (priority, count, state, g); entries whose g is no longer
+    # the best known for an open state are dropped when they reach the top
+    byF = [[(heuristic(start, views[0]), 0, start, 0)], [(heuristic(goal, views[1]), 1, goal, 0)]]
+    byG = [[(0, 0, start, 0)], [(0, 1, goal, 0)]]
+    count = 2
+    best, meet = float('inf'), None
+
+    def clean(heap, side):
+        while heap and (heap[0][2] in closed[side] or heap[0][3] != costs[side][heap[0][2]]):
+            heapq.heappop(heap)
+
+    while True:
+        for side in (0, 1):
+            clean(byF[side], side)
+            clean(byG[side], side)
+        if not byF[0] or not byF[1]:
+            break
+        bound = max(byF[0][0][0], byF[1][0][0], byG[0][0][0] + byG[1][0][0])
+        if best <= bound:
+            break
+
+        side = 0 if len(byF[0]) <= len(byF[1]) else 1
+        _, _, current, g = heapq.heappop(byF[side])
+        closed[side].add(current)
+        stats.expand(len(byF[0]) + len(byF[1]), len(closed[0]) + len(closed[1]))
+        for child, action, stepCost in expanders[side](current):
+            if child in closed[side]:
+                continue
+            childG = g + stepCost
+            if childG < costs[side].get(child, float('inf')):
+                costs[side][child] = childG
+                parents[side][child] = (current, action)
+                heapq.heappush(byF[side], (childG + heuristic(child, views[side]), count, child, childG))
+                heapq.heappush(byG[side], (childG, count, child, childG))
+                count += 1
+                stats.nodesGenerated += 1
+                if child in costs[1 - side] and childG + costs[1 - side][child] < best:
+                    best, meet = childG + costs[1 - side][child], child
+
+    if meet is not None:
+        return stats.done(_joinPlans(parents[0], parents[1], meet))
+    return stats.done(None)
+
+
+def jumpPointSearch(problem):
+    """
+    Jump Point Search for 4-connected, uniform-cost grid problems such as
+    PositionSearchProblem: A* over "jump points" rather than every cell.
+
+    Paths are kept canonical by moving horizontally before turning, so a
+    horizontal scan only stops where a vertical scan from it reaches a jump
+    point, and a vertical scan only stops at the goal or beside a wall corner
+    that forces a horizontal turn.  Straight segments between consecutive jump
+    points are expanded back into single Directions, so the plan has the same
+    cost as aStarSearch with manhattanHeuristic.
+
+    The problem must expose walls (a Grid), a position start state and a goal
+    test; the Manhattan distance to problem.goal is used as the heuristic when
+    the problem has one.  Each expanded jump point counts toward
+    problem._expanded.
+    """
+    from game import Actions
+    stats = SearchStats(problem)
+    walls = problem.walls
+    width, height = walls.width, walls.height
+    start = problem.getStartState()
+    goal = getattr(problem, 'goal', None)
+    if problem.isGoalState(start):
+        return stats.done([])
+
+    def manhattan(position):
+        if goal is None:
+            return 0
+        return abs(position[0] - goal[0]) + abs(position[1] - goal[1])
+    heuristic = stats.timeHeuristic(manhattan)
+
+    def free(x, y):
+        return 0 <= x < width and 0 <= y < height and not walls[x][y]
+
+    def jumpVertical(x, y, dy):
+        while True:
+            y += dy
+            if not free(x, y):
+                return None
+            if problem.isGoalState((x, y)):
+                return (x, y)
+            if (free(x - 1, y) and not free(x - 1, y - dy)) or (free(x + 1, y) and not free(x + 1, y - dy)):
+                return (x, y)
+
+    def jumpHorizontal(x, y, dx):
+        while True:
+            x += dx
+            if not free(x, y):
+                return None
+            if problem.isGoalState((x, y)):
+                return (x, y)
+            if jumpVertical(x, y, 1) is not None or jumpVertical(x, y, -1) is not None:
+                return (x, y)
+
+    def prunedDirections(position, arrival):
+        x, y = position
+        if arrival is None:
+            return [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        dx, dy = arrival
+        if dy == 0:
+            return [(dx, 0), (0, 1), (0, -1)]
+        directions = [(0, dy)]
+        for side in (-1, 1):
+            if free(x + side, y) and not free(x + side, y - dy):
+                directions.append((side, 0))
+        return directions
+
+    marked = set([])
+    parents = {}
+    PQ = util.PriorityQueue()
+    PQ.push((start, None, None, 0), heuristic(start))
+    stats.nodesGenerated += 1
+
+    while not PQ.isEmpty():
+        current, parent, arrival, g = PQ.pop()
+        if current in marked:
+            continue
+        marked.add(current)
+        if parent is not None:
+            parents[current] = parent
+        if current != start and problem.isGoalState(current):
+            break
+        stats.expand(len(PQ.heap), len(marked))
+        if hasattr(problem, '_expanded'):
+            problem._expanded += 1
+        if hasattr(problem, '_visitedlist'):
+            problem._visitedlist.append(current)
+        for dx, dy in prunedDirections(current, arrival):
+            if dy == 0:
+                jumpPoint = jumpHorizontal(current[0], current[1], dx)
+            else:
+                jumpPoint = jumpVertical(current[0], current[1], dy)
+            if jumpPoint is not None and jumpPoint not in marked:
+                jumpG = g + abs(jumpPoint[0] - current[0]) + abs(jumpPoint[1] - current[1])
+                PQ.push((jumpPoint, current, (dx, dy), jumpG), jumpG + heuristic(jumpPoint))
+                stats.nodesGenerated += 1
+    else:
+        return stats.done(None)
+
+    # Unroll each straight jump into single steps
+    plan = []
+    while current in parents:
+        parent = parents[current]
+        dx = (current[0] > parent[0]) - (current[0] < parent[0])
+        dy = (current[1] > parent[1]) - (current[1] < parent[1])
+        steps = abs(current[0] - parent[0]) + abs(current[1] - parent[1])
+        plan.extend([Actions.vectorToDirection((dx, dy))] * steps)
+        current = parent
+    plan.reverse()
+    return stats.done(plan)
+
+
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    IDA*: repeated depth first searches that cut off every node whose
+    f = g + h exceeds a bound, raising the bound to the smallest f that was
+    cut off until a goal is found.  Only the current path is kept in memory
+    (states are checked against it to avoid cycles), at the price of
+    expanding the shallower part of the tree again in every iteration.
+
+    Besides the SearchStats counters, problem._searchStats.extra records
+    iterations and reexpansions (expansions of nodes already within the
+    previous bound).  The closed set is the current path.
+    """
+    stats = SearchStats(problem)
+    stats.extra = {'iterations': 0, 'reexpansions': 0}
+    heuristic = stats.timeHeuristic(heuristic)
+    start = problem.getStartState()
+    stats.nodesGenerated += 1
+    if problem.isGoalState(start):
+        return stats.done([])
+
+    bound = heuristic(start, problem)
+    previousBound = None
+    while True:
+        stats.extra['iterations'] += 1
+        nextBound = float('inf')
+        actions = []
+        onPath = set([start])
+        stats.expand(1, 1)
+        if previousBound is not None:
+            stats.extra['reexpansions'] += 1
+        frames = [(start, 0, iter(problem.getSuccessors(start)))]
+
+        while frames:
+            current, g, successors = frames[-1]
+            for child, action, stepCost in successors:
+                if child in onPath:
+                    continue
+                childG = g + stepCost
+                f = childG + heuristic(child, problem)
+                stats.nodesGenerated += 1
+                if f > bound:
+                    nextBound = min(nextBound, f)
+                    continue
+                if problem.isGoalState(child):
+                    return stats.done(actions + [action])
+                if previousBound is not None and f <= previousBound:
+                    stats.extra['reexpansions'] += 1
+                onPath.add(child)
+                actions.append(action)
+                frames.append((child, childG, iter(problem.getSuccessors(child))))
+                stats.expand(len(frames), len(onPath))
+                break
+            else:
+                frames.pop()
+                onPath.discard(current)
+                if frames:
+                    actions.pop()
+
+        if nextBound == float('inf'):
+            return stats.done(None)
+        previousBound, bound = bound, nextBound
+
+
+class _SMANode:
+    "A node of the search tree kept in memory by simplifiedMemoryBoundedAStarSearch"
+    __slots__ = ('state', 'parent', 'action', 'g', 'f', 'depth', 'children', 'forgotten',
+                 'expanded', 'regenerated', 'inOpen', 'version')
+
+    def __init__(self, state, parent, action, g, f):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.g = g
+        self.f = f
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.children = []
+        self.forgotten = {}  # state -> f of children dropped to free memory
+        self.expanded = False
+        self.regenerated = False
+        self.inOpen = False
+        self.version = 0
+
+
+def simplifiedMemoryBoundedAStarSearch(problem, heuristic=nullHeuristic, memoryLimit=100000):
+    """
+    SMA*: A* that keeps about memoryLimit search nodes in memory.
+
+    When memory is full the shallowest of the highest-f leaves is dropped and
+    its f is remembered by its parent, which goes back on the frontier so
+    the forgotten subtree can be regenerated if it becomes the most promising
+    again.  f values are backed up from children to parents, so the search
+    stays optimal whenever the optimal plan fits in memory.  A successor is
+    skipped while another node in memory reaches the same state at no
+    greater cost.
+
+    The limit is approximate: leaves are only dropped after an expansion, so
+    memory briefly holds up to one node per successor more than memoryLimit.
+    A path can be at most memoryLimit - 1 steps long, and deeper successors
+    are cut off.  Once the best f on the frontier exceeds the f of a cut off
+    successor, the most promising plan cannot fit in memory and the search
+    returns None rather than cycling through ever worse paths (each forgotten
+    and regenerated in turn, at exponential cost).  Any plan it does return
+    is optimal.
+
+    Besides the SearchStats counters, problem._searchStats.extra records
+    reexpansions and forgotten (nodes dropped); peakClosed is the largest
+    number of nodes held in memory and peakFrontier the largest number of
+    them on the frontier.
+    """
+    import heapq
+    memoryLimit = int(memoryLimit)
+    infinity = float('inf')
+    stats = SearchStats(problem)
+    stats.extra = {'reexpansions': 0, 'forgotten': 0}
+    heuristic = stats.timeHeuristic(heuristic)
+
+    start = problem.getStartState()
+    root = _SMANode(start, None, None, 0, heuristic(start, problem))
+    stats.nodesGenerated += 1
+    inMemory = {start: root}
+    numNodes = 1
+    numOpen = [0]
+    bestHeap, worstHeap = [], []
+    counter = [0]
+    cutF = infinity
+
+    def addToOpen(node):
+        if not node.inOpen:
+            numOpen[0] += 1
+        node.inOpen = True
+        node.version += 1
+        counter[0] += 1
+        heapq.heappush(bestHeap, (node.f, -node.depth, counter[0], node, node.version))
+        heapq.heappush(worstHeap, (-node.f, node.depth, counter[0], node, node.version))
+
+    def removeFromOpen(node):
+        numOpen[0] -= 1
+        node.inOpen = False
+        node.version += 1
+
+    def valid(entry):
+        return entry[3].inOpen and entry[3].version == entry[4]
+
+    def popBest():
+        while bestHeap:
+            entry = heapq.heappop(bestHeap)
+            if valid(entry):
+                removeFromOpen(entry[3])
+                return entry[3]
+        return None
+
+    def popWorstLeaf():
+        skipped = []
+        leaf = None
+        while worstHeap:
+            entry = heapq.heappop(worstHeap)
+            if not valid(entry):
+                continue
+            node = entry[3]
+            if node.children or node is root:
+                skipped.append(entry)
+                continue
+            leaf = node
+            break
+        for entry in skipped:
+            heapq.heappush(worstHeap, entry)
+        if leaf is not None:
+            removeFromOpen(leaf)
+        return leaf
+
+    def backup(node):
+        while node is not None and node.expanded:
+            values = [child.f for child in node.children] + list(node.forgotten.values())
+            newF = min(values) if values else infinity
+            if newF == node.f:
+                break
+            node.f = newF
+            if node.inOpen:
+                addToOpen(node)
+            node = node.parent
+
+    addToOpen(root)
+    while True:
+        best = popBest()
+        if best is None or best.f == infinity:
+            return stats.done(None)
+        if problem.isGoalState(best.state):
+            actions = []
+            while best.parent is not None:
+                actions.append(best.action)
+                best = best.parent
+            actions.reverse()
+            return stats.done(actions)
+        if best.f > cutF:
+            # The most promising plan needs more memory than memoryLimit; going
+            # on would only forget and regenerate ever worse paths
+            return stats.done(None)
+
+        stats.expand(numOpen[0], numNodes)
+        if best.expanded or best.regenerated:
+            stats.extra['reexpansions'] += 1
+        best.expanded = True
+        present = set(child.state for child in best.children)
+        for childState, action, stepCost in problem.getSuccessors(best.state):
+            if childState in present:
+                continue
+            g = best.g + stepCost
+            other = inMemory.get(childState)
+            if other is not None and other.g <= g:
+                continue
+            if best.depth + 1 >= memoryLimit - 1 and not problem.isGoalState(childState):
+                # Too deep for memory to hold its path to a goal
+                cutF = min(cutF, max(best.f, g + heuristic(childState, problem)))
+                f = infinity
+            else:
+                f = max(best.f, g + heuristic(childState, problem))
+            child = _SMANode(childState, best, action, g, f)
+            if childState in best.forgotten:
+                child.f = max(f, best.forgotten[childState])
+                child.regenerated = True
+            best.children.append(child)
+            inMemory[childState] = child
+            numNodes += 1
+            stats.nodesGenerated += 1
+            addToOpen(child)
+        # Every successor is now either in memory or dominated by one that is
+        best.forgotten = {}
+        backup(best)
+        if not best.children:
+            # A dead end stays on the frontier with f = infinity so it is the
+            # first leaf dropped when memory runs out
+            addToOpen(best)
+        stats.peakClosed = max(stats.peakClosed, numNodes)
+        stats.peakFrontier = max(stats.peakFrontier, numOpen[0])
+
+        while numNodes > memoryLimit:
+            worst = popWorstLeaf()
+            if worst is None:
+                break
+            parent = worst.parent
+            parent.children.remove(worst)
+            parent.forgotten[worst.state] = min(worst.f, parent.forgotten.get(worst.state, infinity))
+            if inMemory.get(worst.state) is worst:
+                del inMemory[worst.state]
+            numNodes -= 1
+            stats.extra['forgotten'] += 1
+            if not parent.inOpen:
+                addToOpen(parent)
 
 
 # Abbreviations
@@ -196,4 +934,10 @@ bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bibfs = bidirectionalSearch
+biastar = bidirectionalAStarSearch
+jps = jumpPointSearch
+idastar = iterativeDeepeningAStarSearch
+smastar = simplifiedMemoryBoundedAStarSearch
+arastar = anytimeWeightedAStarSearch
 
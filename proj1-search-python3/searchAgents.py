@@ -37,9 +37,16 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import Grid
 import util
 import time
 import search
+import os
+import array
+import hashlib
+import weakref
+import collections
+import pickle
 
 
 class GoWestAgent(Agent):
@@ -71,20 +78,44 @@ class SearchAgent(Agent):
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
 
+    Any other agent arguments are passed to the search function as keyword
+    arguments, e.g. -a fn=smastar,heuristic=foodHeuristic,memoryLimit=50000
+
+    The search statistics (see search.SearchStats) are printed after the
+    search and, with -a statsFile=<file>, also written to that file as JSON.
+    -a cacheHeuristic=True memoizes the heuristic (see CachedHeuristic), keeping
+    at most cacheSize values per problem.  fn=portfolio races several searches
+    in separate processes, e.g.
+    -a fn=portfolio,prob=FoodSearchProblem,members=astar:foodHeuristic|ucs|greedy
+    (see portfolioSearch).
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    statsFile = None  # Subclasses that skip __init__ still see no stats file
+
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', statsFile=None,
+                 cacheHeuristic=False, cacheSize=100000, **searchArgs):
+        self.statsFile = statsFile
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
-        if fn not in dir(search):
+        if fn == 'portfolio':
+            func = portfolioSearch
+        elif fn not in dir(search):
             raise AttributeError(fn + ' is not a search function in search.py.')
-        func = getattr(search, fn)
-        if 'heuristic' not in func.__code__.co_varnames:
+        else:
+            func = getattr(search, fn)
+        argNames = func.__code__.co_varnames[:func.__code__.co_argcount]
+        for name in searchArgs:
+            if name not in argNames:
+                raise AttributeError(name + ' is not an argument of ' + fn + ' in search.py.')
+        searchArgs = dict((name, parseSearchArg(value)) for name, value in searchArgs.items())
+        if searchArgs:
+            print('[SearchAgent] using search arguments %s' % searchArgs)
+        if 'heuristic' not in argNames:
             print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
+            self.searchFunction = lambda x: func(x, **searchArgs)
         else:
             if heuristic in globals().keys():
                 heur = globals()[heuristic]
@@ -93,8 +124,11 @@ class SearchAgent(Agent):
             else:
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
+            if parseSearchArg(cacheHeuristic):
+                print('[SearchAgent] caching up to %s heuristic values per problem' % cacheSize)
+                heur = CachedHeuristic(heur, int(cacheSize))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.searchFunction = lambda x: func(x, heuristic=heur, **searchArgs)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -118,6 +152,10 @@ class SearchAgent(Agent):
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if '_searchStats' in dir(problem):
+            print('Search statistics: %s' % problem._searchStats)
+            if self.statsFile is not None:
+                problem._searchStats.dump(self.statsFile, cost=totalCost, problem=type(problem).__name__)
 
     def getAction(self, state):
         """
@@ -136,6 +174,116 @@ class SearchAgent(Agent):
             return Directions.STOP
 
 
+def parseSearchArg(value):
+    "Converts a command line agent argument (always a string) to a number or boolean where possible"
+    if not isinstance(value, str):
+        return value
+    if value in ('True', 'False'):
+        return value == 'True'
+    for numberType in (int, float):
+        try:
+            return numberType(value)
+        except ValueError:
+            pass
+    return value
+
+
+# Portfolio members whose plans are optimal (given an admissible heuristic)
+OPTIMAL_SEARCHES = set(['ucs', 'uniformCostSearch', 'astar', 'aStarSearch', 'biastar', 'bidirectionalAStarSearch',
+                        'idastar', 'iterativeDeepeningAStarSearch', 'smastar', 'simplifiedMemoryBoundedAStarSearch'])
+
+
+def portfolioSearch(problem, members='astar:foodHeuristic|ucs|greedy', firstAcceptable=False, timeout=None):
+    """
+    Runs several search configurations at once, each in its own process on a
+    copy of problem, and returns the plan of the member that wins.
+
+    members is a '|' separated list of fn or fn:heuristic entries naming
+    functions in search.py and heuristics in searchAgents.py or search.py;
+    greedy is closestDotSearch.  The first plan found by a member in
+    OPTIMAL_SEARCHES wins.  Plans of the other members are kept, and the
+    cheapest of them is returned if no optimal member succeeds within timeout
+    seconds.  With firstAcceptable the first plan of any member wins.  The
+    members still running are then cancelled and their processes stopped.
+
+    The problem must be picklable; PositionSearchProblem, whose cost function
+    is a lambda, is not, and an Exception saying so is raised before any
+    process starts.  The winning member is printed and kept in
+    problem._portfolioWinner, and its expansion count and search statistics
+    are copied onto problem.
+    """
+    import concurrent.futures
+    try:
+        pickle.dumps(problem)
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        raise Exception('portfolioSearch runs each member in another process, so the %s must be picklable '
+                        '(use e.g. prob=FoodSearchProblem or prob=CornersProblem): %s' % (type(problem).__name__, e))
+    specs = members.split('|')
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=len(specs))
+    futures = dict((executor.submit(runPortfolioMember, problem, spec), spec) for spec in specs)
+    winner, fallback = None, None
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=timeout):
+            spec = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print('[portfolio] %s failed: %s' % (spec, e))
+                continue
+            if result[0] is None:
+                print('[portfolio] %s found no plan' % spec)
+            elif firstAcceptable or spec.split(':')[0] in OPTIMAL_SEARCHES:
+                winner = (spec,) + result
+                break
+            elif fallback is None or problem.getCostOfActions(result[0]) < problem.getCostOfActions(fallback[1]):
+                fallback = (spec,) + result
+    except concurrent.futures.TimeoutError:
+        print('[portfolio] no optimal plan within %s seconds' % timeout)
+    finally:
+        stopExecutor(executor)
+
+    if winner is None:
+        winner = fallback
+    if winner is None:
+        return None
+    spec, plan, expanded, stats = winner
+    print('[portfolio] %s won with a plan of cost %s' % (spec, problem.getCostOfActions(plan)))
+    problem._portfolioWinner = spec
+    if expanded is not None:
+        problem._expanded = expanded
+    if stats is not None:
+        problem._searchStats = stats
+    return plan
+
+
+def runPortfolioMember(problem, spec):
+    "Runs one portfolio member; returns (plan, problem._expanded, problem._searchStats)"
+    if ':' in spec:
+        fnName, heuristicName = spec.split(':')
+        heuristic = globals().get(heuristicName) or getattr(search, heuristicName)
+        plan = getattr(search, fnName)(problem, heuristic)
+    elif spec == 'greedy':
+        plan = closestDotSearch(problem)
+    else:
+        plan = getattr(search, spec)(problem)
+    return plan, getattr(problem, '_expanded', None), getattr(problem, '_searchStats', None)
+
+
+def stopExecutor(executor):
+    "Shuts down a ProcessPoolExecutor without waiting for the calls still running"
+    if hasattr(executor, 'terminate_workers'):
+        executor.terminate_workers()
+        return
+    # Before Python 3.14 there is no public way to stop a running call:
+    # shutdown(cancel_futures=True) only drops calls that have not started, so
+    # the losing members would run to completion.  Their worker processes are
+    # taken from the executor's private _processes table and terminated.
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -156,6 +304,7 @@ class PositionSearchProblem(search.SearchProblem):
         goal: A position in the gameState
         """
         self.walls = gameState.getWalls()
+        self.successorTable = getSuccessorTable(self.walls)
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
@@ -195,15 +344,8 @@ class PositionSearchProblem(search.SearchProblem):
          cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x, y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append((nextState, action, cost))
+        costFn = self.costFn
+        successors = [(nextState, action, costFn(nextState)) for nextState, action in self.successorTable[state]]
 
         # Bookkeeping for display purposes
         self._expanded += 1  # DO NOT CHANGE
@@ -213,6 +355,24 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def getPredecessors(self, state):
+        """
+        Returns (predecessor, action, stepCost) triples for the positions one
+        move away from state, where action leads from the predecessor into
+        state and stepCost is the cost of entering state.  Used by the
+        bidirectional searches in search.py; counted as an expansion.
+        """
+        cost = self.costFn(state)
+        predecessors = [(prevState, Actions.reverseDirection(action), cost) for prevState, action in self.successorTable[state]]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1  # DO NOT CHANGE
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -272,6 +432,50 @@ def euclideanHeuristic(position, problem, info={}):
     return ((xy1[0] - xy2[0]) ** 2 + (xy1[1] - xy2[1]) ** 2) ** 0.5
 
 
+class CachedHeuristic:
+    """
+    Wraps a heuristic(state, problem) so that its values are memoized, with a
+    separate least-recently-used cache of at most maxSize entries for every
+    problem it is called with.  States are keyed by problem.heuristicKey(state)
+    when the problem defines it (a cheap canonical form of the state) and by
+    the state itself otherwise.
+
+    Cache hits, misses and evictions are added to the extra counters of the
+    problem's search statistics (problem._searchStats) while a search runs.
+    """
+
+    def __init__(self, heuristic, maxSize=100000):
+        self.heuristic = heuristic
+        self.maxSize = maxSize
+        self.caches = weakref.WeakKeyDictionary()
+
+    def __call__(self, state, problem):
+        cache = self.caches.get(problem)
+        if cache is None:
+            cache = self.caches[problem] = collections.OrderedDict()
+        key = problem.heuristicKey(state) if hasattr(problem, 'heuristicKey') else state
+        stats = getattr(problem, '_searchStats', None)
+        counters = stats.extra if stats is not None else {}
+
+        hits = counters.get('heuristicCacheHits', 0)
+        misses = counters.get('heuristicCacheMisses', 0)
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            hits += 1
+        else:
+            value = self.heuristic(state, problem)
+            cache[key] = value
+            misses += 1
+            if len(cache) > self.maxSize:
+                cache.popitem(last=False)
+                counters['heuristicCacheEvictions'] = counters.get('heuristicCacheEvictions', 0) + 1
+        counters['heuristicCacheHits'] = hits
+        counters['heuristicCacheMisses'] = misses
+        counters['heuristicCacheHitRate'] = hits / (hits + misses)
+        return value
+
+
 #####################################################
 # This portion is incomplete.  Time to write code!  #
 #####################################################
@@ -280,7 +484,9 @@ class CornersProblem(search.SearchProblem):
     """
     This search problem finds paths through all four corners of a layout.
 
-    You must select a suitable state space and successor function
+    A search state is a tuple (position, visited) where visited is a bitmask
+    with bit i set once corners[i] has been reached; cornerBits maps each
+    corner to its bit.
     """
 
     def __init__(self, startingGameState):
@@ -288,6 +494,7 @@ class CornersProblem(search.SearchProblem):
         Stores the walls, pacman's starting position and corners.
         """
         self.walls = startingGameState.getWalls()
+        self.successorTable = getSuccessorTable(self.walls)
         self.startingPosition = startingGameState.getPacmanPosition()
         top, right = self.walls.height - 2, self.walls.width - 2
         self.corners = ((1, 1), (1, top), (right, 1), (right, top))
@@ -297,8 +504,10 @@ class CornersProblem(search.SearchProblem):
         self._expanded = 0  # DO NOT CHANGE; Number of search nodes expanded
         # Please add any code here which you would like to use
         # in initializing the problem
-        self.startState = (self.startingPosition, "")
-        self.visitedSequences = set([])
+        self.cornerBits = dict((corner, 1 << i) for i, corner in enumerate(self.corners))
+        self.allCorners = (1 << len(self.corners)) - 1
+        self.startState = (self.startingPosition, self.cornerBits.get(self.startingPosition, 0))
+        self.heuristicInfo = {}
         # For display purposes
         self._visited, self._visitedlist = {}, []
         self.startingGameState = startingGameState
@@ -314,7 +523,7 @@ class CornersProblem(search.SearchProblem):
         """
         Returns whether this search state is a goal state of the problem.
         """
-        return len(state[1]) == 4
+        return state[1] == self.allCorners
 
     def getSuccessors(self, state):
         """
@@ -327,24 +536,10 @@ class CornersProblem(search.SearchProblem):
             is the incremental cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x, y = state[0]
-            self.position = state[0]
-            visited_corners = state[1]
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-
-            if not self.walls[nextx][nexty]:
-                if (nextx, nexty) in self.corners:
-                    corner_num = self.getCornerNum((nextx, nexty))
-                    nextVisitedCorner = visited_corners + corner_num
-                    if corner_num not in visited_corners and nextVisitedCorner not in self.visitedSequences:
-                        nextState = ((nextx, nexty), nextVisitedCorner)
-                        successors.append((nextState, action, 1))
-                else:
-                    nextState = ((nextx, nexty), visited_corners)
-                    successors.append((nextState, action, 1))
+        position, visited = state
+        cornerBits = self.cornerBits
+        successors = [((nextPosition, visited | cornerBits.get(nextPosition, 0)), action, 1)
+                      for nextPosition, action in self.successorTable[position]]
 
         # Bookkeeping for display purposes
         if state not in self._visited:
@@ -367,17 +562,6 @@ class CornersProblem(search.SearchProblem):
             if self.walls[x][y]: return 999999
         return len(actions)
 
-    def getCornerNum(self, corner):
-        x, y = corner
-        if (x, y) == self.corners[0]:
-            return "1"
-        elif (x, y) == self.corners[1]:
-            return "2"
-        elif (x, y) == self.corners[2]:
-            return "3"
-        elif (x, y) == self.corners[3]:
-            return "4"
-
 
 def cornersHeuristic(state, problem):
     """
@@ -391,21 +575,58 @@ def cornersHeuristic(state, problem):
     This function should always return a number that is a lower bound on the
     shortest path from the state to a goal of the problem; i.e.  it should be
     admissible (as well as consistent).
-    """
-    corners = problem.corners  # These are the corner coordinates
-    walls = problem.walls  # These are the walls of the maze, as a Grid (game.py)
 
-    max_distance = 0
-    sumSearchedCorners = 0
-    for corner in corners:
-        if problem.getCornerNum(corner) not in state[1]:
-            xy1 = state[0]
-            xy2 = corner
-            dist = mazeDistance(xy1, xy2, problem.startingGameState)
-            if dist> max_distance:
-                max_distance = dist
-            sumSearchedCorners += 1
-    return max_distance
+    The heuristic is the length of the shortest tour from the position through
+    every unvisited corner, with maze distances for the legs.  The distances
+    come from the layout's shared MazeDistanceOracle, and the shortest tour
+    from each corner through every set of corners is computed once per
+    problem and kept in problem.heuristicInfo, so a call is a few table
+    lookups.
+    """
+    position, visited = state
+    remaining = problem.allCorners & ~visited
+    if remaining == 0:
+        return 0
+    info = problem.heuristicInfo
+    if 'oracle' not in info:
+        info['oracle'] = getMazeDistanceOracle(problem.walls)
+        info['tours'] = shortestCornerTours(problem.corners, info['oracle'])
+    oracle, tours = info['oracle'], info['tours']
+
+    best = float('inf')
+    for i, corner in enumerate(problem.corners):
+        bit = 1 << i
+        if remaining & bit:
+            distance = oracle.distance(position, corner)
+            if distance is not None and distance + tours[i][remaining & ~bit] < best:
+                best = distance + tours[i][remaining & ~bit]
+    return best
+
+
+def shortestCornerTours(corners, oracle):
+    """
+    Returns tours where tours[i][mask] is the length of the shortest walk that
+    starts at corners[i] and visits every corner whose bit is set in mask
+    (bit i unset), with maze distances from oracle (a MazeDistanceOracle).
+    """
+    infinity = float('inf')
+    numCorners = len(corners)
+    matrix = [[oracle.distance(start, corner) for corner in corners] for start in corners]
+    matrix = [[infinity if d is None else d for d in row] for row in matrix]
+    tours = [[infinity] * (1 << numCorners) for _ in range(numCorners)]
+    for i in range(numCorners):
+        tours[i][0] = 0
+    # Masks are visited in increasing order, so smaller subsets are ready first
+    for mask in range(1, 1 << numCorners):
+        for i in range(numCorners):
+            if mask & (1 << i):
+                continue
+            for j in range(numCorners):
+                if mask & (1 << j):
+                    cost = matrix[i][j] + tours[j][mask & ~(1 << j)]
+                    if cost < tours[i][mask]:
+                        tours[i][mask] = cost
+    return tours
 
 
 class AStarCornersAgent(SearchAgent):
@@ -416,19 +637,123 @@ class AStarCornersAgent(SearchAgent):
         self.searchType = CornersProblem
 
 
+class FoodBitmask:
+    """
+    An immutable set of remaining food stored as a single integer bitmask.
+
+    Bit i is set while the i-th food of the starting layout (in the order of
+    Grid.asList) is uneaten.  The index from positions to bits is built once
+    per layout and shared by every mask derived from it, so hashing a mask is
+    hashing an int and eating a dot is one bit operation.
+
+    Masks answer the read-only part of the Grid interface (food[x][y],
+    count(), asList()) so heuristics written against a food Grid keep working,
+    and toGrid() returns an equivalent Grid when one is really needed.
+    """
+    __slots__ = ('bits', 'index')
+
+    def __init__(self, bits, index):
+        self.bits = bits
+        self.index = index
+
+    def fromGrid(grid):
+        "Returns the mask holding all of the food in grid"
+        positions = grid.asList()
+        index = _FoodIndex(grid.width, grid.height, positions)
+        return FoodBitmask((1 << len(positions)) - 1, index)
+    fromGrid = staticmethod(fromGrid)
+
+    def hasFood(self, x, y):
+        bit = self.index.bitOf.get((x, y))
+        return bit is not None and (self.bits >> bit) & 1 == 1
+
+    def withoutFood(self, x, y):
+        "Returns the mask with the food at (x, y) eaten (self if there is none)"
+        bit = self.index.bitOf.get((x, y))
+        if bit is None or not (self.bits >> bit) & 1:
+            return self
+        return FoodBitmask(self.bits & ~(1 << bit), self.index)
+
+    def __getitem__(self, x):
+        return _FoodBitmaskColumn(self, x)
+
+    def count(self, item=True):
+        remaining = bin(self.bits).count('1')
+        if item:
+            return remaining
+        return self.index.width * self.index.height - remaining
+
+    def asList(self, key=True):
+        if not key:
+            return self.toGrid().asList(False)
+        positions = self.index.positions
+        foodList = []
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            foodList.append(positions[low.bit_length() - 1])
+            bits ^= low
+        return foodList
+
+    def toGrid(self):
+        grid = Grid(self.index.width, self.index.height)
+        for x, y in self.asList():
+            grid[x][y] = True
+        return grid
+
+    def copy(self):
+        # Masks are immutable, so they can be shared freely
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, FoodBitmask): return False
+        return self.bits == other.bits and self.index is other.index
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __str__(self):
+        return str(self.toGrid())
+
+
+class _FoodIndex:
+    "The layout-wide mapping between food positions and FoodBitmask bits"
+
+    def __init__(self, width, height, positions):
+        self.width = width
+        self.height = height
+        self.positions = positions
+        self.bitOf = dict((pos, i) for i, pos in enumerate(positions))
+
+
+class _FoodBitmaskColumn:
+    "Supports the food[x][y] lookups of the Grid interface on a FoodBitmask"
+    __slots__ = ('mask', 'x')
+
+    def __init__(self, mask, x):
+        self.mask = mask
+        self.x = x
+
+    def __getitem__(self, y):
+        return self.mask.hasFood(self.x, y)
+
+
 class FoodSearchProblem:
     """
     A search problem associated with finding the a path that collects all of the
     food (dots) in a Pacman game.
 
-    A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
+    A search state in this problem is a tuple ( pacmanPosition, food ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
-      foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+      food:           a FoodBitmask of the remaining food, which supports the
+                      food[x][y], count() and asList() calls of a Grid (see
+                      game.py); use food.toGrid() for a full Grid
     """
 
     def __init__(self, startingGameState):
-        self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
+        self.start = (startingGameState.getPacmanPosition(), FoodBitmask.fromGrid(startingGameState.getFood()))
         self.walls = startingGameState.getWalls()
+        self.successorTable = getSuccessorTable(self.walls)
         self.startingGameState = startingGameState
         self._expanded = 0  # DO NOT CHANGE
         self.heuristicInfo = {}  # A dictionary for the heuristic to store information
@@ -437,21 +762,21 @@ class FoodSearchProblem:
         return self.start
 
     def isGoalState(self, state):
-        return state[1].count() == 0
+        return state[1].bits == 0
+
+    def heuristicKey(self, state):
+        "A cheap canonical key for state, used by CachedHeuristic"
+        return state[0], state[1].bits
 
     def getSuccessors(self, state):
         "Returns successor states, the actions they require, and a cost of 1."
         successors = []
         self._expanded += 1  # DO NOT CHANGE
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x, y = state[0]
-            self.position = (x, y)
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append((((nextx, nexty), nextFood), direction, 1))
+        self.position = state[0]
+        food = state[1]
+        for nextPosition, direction in self.successorTable[state[0]]:
+            nextFood = food.withoutFood(*nextPosition)
+            successors.append(((nextPosition, nextFood), direction, 1))
         return successors
 
     def getCostOfActions(self, actions):
@@ -490,9 +815,10 @@ def foodHeuristic(state, problem):
     other hand, inadmissible or inconsistent heuristics may find optimal
     solutions, so be careful.
 
-    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
-    (see game.py) of either True or False. You can call foodGrid.asList() to get
-    a list of food coordinates instead.
+    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a
+    FoodBitmask that reads like a Grid (see game.py) of either True or False.
+    You can call foodGrid.asList() to get a list of food coordinates instead, or
+    foodGrid.toGrid() for a real Grid.
 
     If you want access to info like walls, capsules, etc., you can query the
     problem.  For example, problem.walls gives you a Grid of where the walls
@@ -504,94 +830,181 @@ def foodHeuristic(state, problem):
     value, try: problem.heuristicInfo['wallCount'] = problem.walls.count()
     Subsequent calls to this heuristic can access
     problem.heuristicInfo['wallCount']
+
+    This heuristic is the maze distance to the nearest food plus the weight
+    of a minimum spanning tree over the remaining food under maze distance:
+    any plan first reaches some food and then visits the rest, covering a
+    spanning tree of them.  Maze distances come from the shared
+    MazeDistanceOracle of the layout.  The tree only depends on the food left,
+    so its weight is kept in problem.heuristicInfo by food set and every state
+    that shares its parent's food (all moves that eat nothing) reuses it.
     """
     position, foodGrid = state
-
-    # Find minimum Manhattan Distance food from position
-    minDist = 999999
-    minPoint = None
-    for food in foodGrid.asList():
-        manDist = abs(position[0] - food[0]) + abs(position[1] - food[1])
-        if manDist < minDist:
-            minDist = manDist
-            minPoint = food
-
-    # Find maze distance to minimum manhattan distance food
-    if minPoint is not None:
-        dist = mazeDistance(position, minPoint, problem.startingGameState)
-    else:
+    if foodGrid.bits == 0:
         return 0  # End of path
 
-    # Retrace the path to find amount of food not on the path
-    path = search.bfs(PositionSearchProblem(problem.startingGameState, start=position, goal=minPoint, warn=False, visualize=False))
-    count = len(foodGrid.asList())  # Amount of food
-    x, y = position
-    if path is not None:
-        for dir in path:
-            x2, y2 = getPos(dir)
-            x += x2
-            y += y2
-            if foodGrid[x][y]:
-                count -= 1
+    info = problem.heuristicInfo
+    if 'foodTreeWeights' not in info:
+        info['oracle'] = getMazeDistanceOracle(problem.walls)
+        info['foodTreeWeights'] = {}
+    oracle = info['oracle']
+    foodList = foodGrid.asList()
 
-    cost = dist + count
+    numCells = len(oracle.cells)
+    row = oracle.cellIndex[position] * numCells
+    distances = oracle.distances
+    nearest = min(distances[row + oracle.cellIndex[food]] for food in foodList)
 
-    return cost
+    treeWeight = info['foodTreeWeights'].get(foodGrid.bits)
+    if treeWeight is None:
+        treeWeight = spanningTreeWeight(foodList, oracle)
+        info['foodTreeWeights'][foodGrid.bits] = treeWeight
+    return nearest + treeWeight
 
 
-def getPos(dir):
-    if dir == Directions.WEST:
-        return -1, 0
-    elif dir == Directions.EAST:
-        return 1, 0
-    elif dir == Directions.NORTH:
-        return 0, 1
-    elif dir == Directions.SOUTH:
-        return 0, -1
+def spanningTreeWeight(points, oracle):
+    """
+    Returns the weight of a minimum spanning tree over points (open cells)
+    under the maze distances of oracle, using Prim's algorithm on the complete
+    graph of the points.
+    """
+    if not points:
+        return 0
+    numCells = len(oracle.cells)
+    distances = oracle.distances
+    indices = [oracle.cellIndex[point] for point in points]
+    # best[i] is the shortest edge from point i to the tree built so far
+    best = [distances[indices[0] * numCells + j] for j in indices]
+    remaining = list(range(1, len(points)))
+    weight = 0
+    while remaining:
+        nearest = min(remaining, key=best.__getitem__)
+        remaining.remove(nearest)
+        weight += best[nearest]
+        row = indices[nearest] * numCells
+        for i in remaining:
+            d = distances[row + indices[i]]
+            if d < best[i]:
+                best[i] = d
+    return weight
 
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
 
     def registerInitialState(self, state):
+        """
+        Plans every segment with the layout's ClosestDotPlanner, tracking only
+        Pacman's position and a copy of the food grid between segments.  The
+        planner only walks legal moves, so the segments are not replayed
+        through GameState.generateSuccessor.
+        """
+        starttime = time.time()
+        planner = getClosestDotPlanner(state.getWalls())
+        position = state.getPacmanPosition()
+        food = state.getFood().copy()
+        foodLeft = food.count()
         self.actions = []
-        currentState = state
-        while (currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState)  # The missing piece
+        while foodLeft > 0:
+            nextPathSegment, position = planner.findPath(position, food)
+            if nextPathSegment is None:
+                break  # The remaining food cannot be reached
             self.actions += nextPathSegment
-            for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % t)
-                currentState = currentState.generateSuccessor(0, action)
+            x, y = position
+            food[x][y] = False
+            foodLeft -= 1
         self.actionIndex = 0
-        print('Path found with cost %d.' % len(self.actions))
+        print('Path found with cost %d in %.3f seconds.' % (len(self.actions), time.time() - starttime))
 
     def findPathToClosestDot(self, gameState):
         """
         Returns a path (a list of actions) to the closest dot, starting from
         gameState.
         """
-        # Here are some useful elements of the startState
-        startPosition = gameState.getPacmanPosition()
-        food = gameState.getFood()
-        walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState)
+        planner = getClosestDotPlanner(gameState.getWalls())
+        path, _ = planner.findPath(gameState.getPacmanPosition(), gameState.getFood())
+        if path is None:
+            return []
+        return path
 
-        minDist = 999999
-        minPoint = None
-        for food in food.asList():
-            manDist = abs(startPosition[0] - food[0]) + abs(startPosition[1] - food[1])
-            if manDist < minDist:
-                minDist = manDist
-                minPoint = food
 
-        path = []
-        if minPoint is not None:
-            path = search.bfs(problem)
+def closestDotSearch(problem):
+    """
+    Greedy plan for a FoodSearchProblem (or any problem whose states are
+    (position, food) pairs with a food grid): repeatedly walk to the closest
+    remaining food.  Fast, but usually not optimal.
+    """
+    position, food = problem.getStartState()
+    food = food.toGrid() if hasattr(food, 'toGrid') else food.copy()
+    planner = getClosestDotPlanner(problem.walls)
+    plan = []
+    for _ in range(food.count()):
+        segment, position = planner.findPath(position, food)
+        if segment is None:
+            return None
+        plan += segment
+        x, y = position
+        food[x][y] = False
+    return plan
+
+
+class ClosestDotPlanner:
+    """
+    Breadth first search from a position to the nearest food, over the open
+    cells of one layout.  The cell numbering, the neighbor lists and the
+    arrays a search fills in are built once and reused by every search: each
+    search marks the cells it reaches with a fresh stamp instead of clearing
+    the arrays.  Neighbors are tried in the order of getSuccessorTable, so the
+    paths are those search.bfs finds on an AnyFoodSearchProblem.
+    """
 
-        return path
+    def __init__(self, walls):
+        successorTable = getSuccessorTable(walls)
+        self.cells = list(successorTable)
+        self.cellIndex = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.neighbors = [tuple((self.cellIndex[nextCell], action) for nextCell, action in successorTable[cell])
+                          for cell in self.cells]
+        self.reached = [0] * len(self.cells)
+        self.parent = [0] * len(self.cells)
+        self.parentAction = [None] * len(self.cells)
+        self.stamp = 0
+
+    def findPath(self, start, food):
+        """
+        Returns (actions, goal) for a shortest path from start to the nearest
+        cell where food[x][y] is true, or (None, None) if there is none.
+        """
+        x, y = start
+        if food[x][y]:
+            return [], start
+        self.stamp += 1
+        stamp, reached, parent, parentAction = self.stamp, self.reached, self.parent, self.parentAction
+        cells, neighbors = self.cells, self.neighbors
+
+        source = self.cellIndex[start]
+        reached[source] = stamp
+        frontier = [source]
+        head = 0
+        while head < len(frontier):
+            current = frontier[head]
+            head += 1
+            for nextCell, action in neighbors[current]:
+                if reached[nextCell] == stamp:
+                    continue
+                reached[nextCell] = stamp
+                parent[nextCell] = current
+                parentAction[nextCell] = action
+                x, y = cells[nextCell]
+                if food[x][y]:
+                    actions = []
+                    cell = nextCell
+                    while cell != source:
+                        actions.append(parentAction[cell])
+                        cell = parent[cell]
+                    actions.reverse()
+                    return actions, (x, y)
+                frontier.append(nextCell)
+        return None, None
 
 
 class AnyFoodSearchProblem(PositionSearchProblem):
@@ -616,6 +1029,7 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
+        self.successorTable = getSuccessorTable(self.walls)
         self.startState = gameState.getPacmanPosition()
         self.costFn = lambda x: 1
         self._visited, self._visitedlist, self._expanded = {}, [], 0  # DO NOT CHANGE
@@ -638,11 +1052,150 @@ def mazeDistance(point1, point2, gameState):
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
     This might be a useful helper function for your ApproximateSearchAgent.
+
+    Distances are answered by the MazeDistanceOracle for the layout's walls,
+    which runs the breadth first searches once per layout instead of once per
+    call.
     """
     x1, y1 = point1
     x2, y2 = point2
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return getMazeDistanceOracle(walls).distance(point1, point2)
+
+
+MAZE_DISTANCE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mazeDistanceCache')
+
+
+class MazeDistanceOracle:
+    """
+    All-pairs shortest path lengths between the open cells of a walls Grid.
+
+    A breadth first search is run from every open cell once; the results are
+    kept in a single flat array indexed by (source, target) cell numbers, so
+    distance(a, b) is a dictionary lookup and an array read.  When cacheDir is
+    given the array is persisted there under a hash of the walls, and later
+    oracles for the same layout load it instead of searching again.
+    """
+    def __init__(self, walls, cacheDir=MAZE_DISTANCE_CACHE_DIR):
+        self.cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+        self.cellIndex = dict((cell, i) for i, cell in enumerate(self.cells))
+        numCells = len(self.cells)
+        if numCells < 0xFFFF:
+            self.typecode, self.infinity = 'H', 0xFFFF
+        else:
+            self.typecode, self.infinity = 'I', 0xFFFFFFFF
+
+        self.cacheFile = None
+        if cacheDir is not None:
+            key = hashlib.sha1(str(walls).encode()).hexdigest()
+            self.cacheFile = os.path.join(cacheDir, '%s.%s.dist' % (key, self.typecode))
+
+        self.distances = self._load()
+        if self.distances is None:
+            self.distances = self._compute(walls)
+            self._save()
+
+    def distance(self, point1, point2):
+        """
+        Returns the maze distance between two open cells, or None if no path
+        joins them.
+        """
+        i = self.cellIndex[point1]
+        j = self.cellIndex[point2]
+        d = self.distances[i * len(self.cells) + j]
+        if d == self.infinity:
+            return None
+        return d
+
+    def _compute(self, walls):
+        numCells = len(self.cells)
+        cellIndex = self.cellIndex
+        successorTable = getSuccessorTable(walls)
+        neighbors = [[cellIndex[n] for n, _ in successorTable[cell]] for cell in self.cells]
+
+        distances = array.array(self.typecode, [self.infinity]) * (numCells * numCells)
+        for source in range(numCells):
+            row = source * numCells
+            distances[row + source] = 0
+            frontier = [source]
+            depth = 0
+            while frontier:
+                depth += 1
+                nextFrontier = []
+                for cell in frontier:
+                    for n in neighbors[cell]:
+                        if distances[row + n] == self.infinity:
+                            distances[row + n] = depth
+                            nextFrontier.append(n)
+                frontier = nextFrontier
+        return distances
+
+    def _load(self):
+        if self.cacheFile is None:
+            return None
+        distances = array.array(self.typecode)
+        data = util.readCacheFile(self.cacheFile)
+        if data is None or len(data) != len(self.cells) * len(self.cells) * distances.itemsize:
+            return None
+        distances.frombytes(data)
+        return distances
+
+    def _save(self):
+        if self.cacheFile is not None:
+            util.writeCacheFile(self.cacheFile, self.distances)
+
+
+def buildSuccessorTable(walls):
+    """
+    Returns a dictionary from every open cell of walls to a tuple of its
+    (nextPosition, action) moves, in the North, South, East, West order the
+    search problems have always used.
+    """
+    table = {}
+    moves = [(action, Actions.directionToVector(action)) for action in
+             [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]]
+    for x in range(walls.width):
+        for y in range(walls.height):
+            if walls[x][y]: continue
+            neighbors = []
+            for action, (dx, dy) in moves:
+                nextx, nexty = int(x + dx), int(y + dy)
+                if 0 <= nextx < walls.width and 0 <= nexty < walls.height and not walls[nextx][nexty]:
+                    neighbors.append(((nextx, nexty), action))
+            table[(x, y)] = tuple(neighbors)
+    return table
+
+
+_mazeDistanceOracles = weakref.WeakKeyDictionary()
+_successorTables = weakref.WeakKeyDictionary()
+_closestDotPlanners = weakref.WeakKeyDictionary()
+
+
+def _lookupByWalls(cache, walls, factory):
+    """
+    Per-layout data is looked up by the walls Grid, which hashes and compares
+    by content, so layouts with the same walls share an entry.  The caches
+    hold the walls weakly and an entry goes away with its walls, so the
+    values must not keep a reference to the walls themselves.
+    """
+    entry = cache.get(walls)
+    if entry is None:
+        entry = cache[walls] = factory(walls)
+    return entry
+
+
+def getMazeDistanceOracle(walls):
+    "Returns the shared MazeDistanceOracle for a walls Grid"
+    return _lookupByWalls(_mazeDistanceOracles, walls, MazeDistanceOracle)
+
+
+def getSuccessorTable(walls):
+    "Returns the shared table built by buildSuccessorTable for a walls Grid"
+    return _lookupByWalls(_successorTables, walls, buildSuccessorTable)
+
+
+def getClosestDotPlanner(walls):
+    "Returns the shared ClosestDotPlanner for a walls Grid"
+    return _lookupByWalls(_closestDotPlanners, walls, ClosestDotPlanner)
@@ -0,0 +1,117 @@
+# searchbench.py
+# --------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Solves every layout matching a glob with every search configuration, in a
+pool of worker processes and without building a Game or a display, and writes
+one CSV row per (layout, configuration) pair with the plan cost, nodes
+expanded and wall time.
+
+A configuration is written like the SearchAgent options of pacman.py -a, and
+configurations are separated by semicolons:
+
+> python searchbench.py
+> python searchbench.py -l 'layouts/*Search.lay' -c 'fn=astar,prob=FoodSearchProblem,heuristic=foodHeuristic' -o food.csv
+"""
+
+import contextlib
+import csv
+import glob
+import io
+import os
+import sys
+import time
+import layout
+import pacman
+import searchAgents
+import util
+
+COLUMNS = ['layout', 'config', 'status', 'cost', 'expanded', 'generated', 'seconds']
+
+
+def solve(layoutFile, config, timeout):
+    """
+    Runs the search described by config on layoutFile and returns a CSV row.
+    The status column is ok, noPlan, timeout or the error raised.
+    """
+    row = dict((column, '') for column in COLUMNS)
+    row['layout'] = os.path.splitext(os.path.basename(layoutFile))[0]
+    row['config'] = config
+    gameState = pacman.GameState()
+    gameState.initialize(layout.tryToLoad(layoutFile), 0)
+
+    start = time.perf_counter()
+    try:
+        # SearchAgent and the problems report progress on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = searchAgents.SearchAgent(**pacman.parseAgentArgs(config))
+            problem = agent.searchType(gameState)
+            plan = util.TimeoutFunction(agent.searchFunction, timeout)(problem)
+    except util.TimeoutFunctionException:
+        row['status'] = 'timeout'
+        return row
+    except Exception as e:
+        row['status'] = '%s: %s' % (type(e).__name__, e)
+        return row
+    row['seconds'] = '%.4f' % (time.perf_counter() - start)
+
+    row['status'] = 'ok' if plan is not None else 'noPlan'
+    if plan is not None:
+        row['cost'] = problem.getCostOfActions(plan)
+    if hasattr(problem, '_expanded'):
+        row['expanded'] = problem._expanded
+    if hasattr(problem, '_searchStats'):
+        row['generated'] = problem._searchStats.nodesGenerated
+    return row
+
+
+def runBench(layoutFiles, configs, outFile, workers=None, timeout=60):
+    "Solves every layout with every configuration and writes the rows to outFile as they finish"
+    import concurrent.futures
+    tasks = [(layoutFile, config) for layoutFile in layoutFiles for config in configs]
+    writer = csv.DictWriter(outFile, COLUMNS)
+    writer.writeheader()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve, layoutFile, config, timeout) for layoutFile, config in tasks]
+        for future in futures:
+            row = future.result()
+            writer.writerow(row)
+            outFile.flush()
+            print('%-20s %-60s %s' % (row['layout'], row['config'], row['status']), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    from optparse import OptionParser
+    parser = OptionParser(description='Benchmark search configurations over many layouts')
+    parser.add_option('-l', '--layouts', dest='layouts', default='layouts/*.lay',
+                      help='glob of layout files (default %default)')
+    parser.add_option('-c', '--configs', dest='configs', default='fn=bfs;fn=astar,heuristic=manhattanHeuristic',
+                      help='semicolon separated SearchAgent options (default %default)')
+    parser.add_option('-o', '--output', dest='output', default='searchbench.csv',
+                      help='CSV file to write, or - for stdout (default %default)')
+    parser.add_option('-j', '--workers', dest='workers', type='int', default=None,
+                      help='number of worker processes (default: one per CPU)')
+    parser.add_option('-t', '--timeout', dest='timeout', type='int', default=60,
+                      help='seconds allowed for each search (default %default)')
+    options, _ = parser.parse_args()
+
+    layoutFiles = sorted(glob.glob(options.layouts))
+    if not layoutFiles:
+        raise Exception('No layout files match ' + options.layouts)
+    configs = [config for config in options.configs.split(';') if config]
+    if options.output == '-':
+        runBench(layoutFiles, configs, sys.stdout, options.workers, options.timeout)
+    else:
+        with open(options.output, 'w', newline='') as outFile:
+            runBench(layoutFiles, configs, outFile, options.workers, options.timeout)
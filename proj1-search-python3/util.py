@@ -27,6 +27,7 @@
 
 
 import sys
+import os
 import inspect
 import heapq, random
 
@@ -205,6 +206,123 @@ class PriorityQueue:
         else:
             self.push(item, priority)
 
+class IndexedPriorityQueue:
+    """
+      A drop-in alternative to PriorityQueue for callers that rely on update.
+
+      The default (indexed) mode keeps a binary heap together with a
+      dictionary from each item to its slot in the heap, so update is a
+      single O(log n) sift instead of a linear scan plus heapify.  Items must
+      therefore be hashable, and each item is held at most once.
+
+      With lazy=True the queue instead leaves superseded entries in the heap
+      and skips them when they surface in pop; this trades memory for
+      cheaper updates and suits callers that prefer duplicate entries.
+
+      Ties are broken in insertion order, exactly as in PriorityQueue.
+
+      Pushing an item that is already queued keeps the lower of its two
+      priorities, as update does.  PriorityQueue would hold both entries
+      instead, but the lower one would come out first just the same.
+    """
+    def  __init__(self, lazy=False):
+        self.heap = []
+        self.count = 0
+        self.lazy = lazy
+        # indexed mode: item -> slot in heap; lazy mode: item -> (priority, count) of its live entry
+        self.index = {}
+
+    def push(self, item, priority):
+        "Adds item with the given priority; an item already queued keeps the lower of its priorities"
+        if item in self.index:
+            self.update(item, priority)
+            return
+        if self.lazy:
+            self.index[item] = (priority, self.count)
+            heapq.heappush(self.heap, (priority, self.count, item))
+        else:
+            self.heap.append((priority, self.count, item))
+            self.index[item] = len(self.heap) - 1
+            self._siftUp(len(self.heap) - 1)
+        self.count += 1
+
+    def pop(self):
+        if self.lazy:
+            while True:
+                (priority, count, item) = heapq.heappop(self.heap)
+                if self.index.get(item) == (priority, count):
+                    del self.index[item]
+                    return item
+        last = self.heap.pop()
+        if not self.heap:
+            del self.index[last[2]]
+            return last[2]
+        (_, _, item) = self.heap[0]
+        del self.index[item]
+        self.heap[0] = last
+        self.index[last[2]] = 0
+        self._siftDown(0)
+        return item
+
+    def isEmpty(self):
+        return len(self.index) == 0
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update: only ever lowers the priority
+        # of an item already queued, and behaves like push otherwise.
+        if self.lazy:
+            if item in self.index:
+                if self.index[item][0] <= priority:
+                    return
+                # Keep the original tie-breaking count, as PriorityQueue does
+                count = self.index[item][1]
+                self.index[item] = (priority, count)
+                heapq.heappush(self.heap, (priority, count, item))
+            else:
+                self.push(item, priority)
+        elif item in self.index:
+            slot = self.index[item]
+            (p, c, _) = self.heap[slot]
+            if p <= priority:
+                return
+            self.heap[slot] = (priority, c, item)
+            self._siftUp(slot)
+        else:
+            self.push(item, priority)
+
+    def _siftUp(self, slot):
+        heap, index = self.heap, self.index
+        entry = heap[slot]
+        while slot > 0:
+            parent = (slot - 1) >> 1
+            if entry < heap[parent]:
+                heap[slot] = heap[parent]
+                index[heap[slot][2]] = slot
+                slot = parent
+            else:
+                break
+        heap[slot] = entry
+        index[entry[2]] = slot
+
+    def _siftDown(self, slot):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[slot]
+        while True:
+            child = 2 * slot + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if heap[child] < entry:
+                heap[slot] = heap[child]
+                index[heap[slot][2]] = slot
+                slot = child
+            else:
+                break
+        heap[slot] = entry
+        index[entry[2]] = slot
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
@@ -596,6 +714,36 @@ def pause():
     """
     input("<Press enter/return to continue>")
 
+def readCacheFile(fileName):
+    """
+    Returns the contents of a file written by writeCacheFile as bytes, or None
+    if the file does not exist or cannot be read.
+    """
+    try:
+        with open(fileName, 'rb') as f:
+            return f.read()
+    except (IOError, OSError):
+        return None
+
+def writeCacheFile(fileName, data):
+    """
+    Writes data (bytes, a bytearray or an array.array) to fileName, creating
+    its directory if needed.  The data goes to a temporary file that then
+    replaces fileName, so other processes never read a partly written file.
+    Caches are only an optimization, so errors are ignored: an unwritable
+    directory just means the next run computes the data again.
+    """
+    try:
+        directory = os.path.dirname(fileName)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+        tmpFile = '%s.%d.tmp' % (fileName, os.getpid())
+        with open(tmpFile, 'wb') as f:
+            f.write(data)
+        os.replace(tmpFile, fileName)
+    except (IOError, OSError):
+        pass
+
 
 # code to handle timeouts
 #
@@ -25,6 +25,7 @@ import time
 import os
 import traceback
 import sys
+import random
 
 #######################
 # Parts worth reading #
@@ -169,11 +170,23 @@ class AgentState:
         return self.configuration.getDirection()
 
 
+_BITS_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_DIGITS_TO_BITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
 class Grid:
     """
-    A 2-dimensional array of objects backed by a list of lists.  Data is accessed
-    via grid[x][y] where (x,y) are positions on a Pacman map with x horizontal,
-    y vertical and the origin (0,0) in the bottom left corner.
+    A 2-dimensional array of booleans stored one byte per cell in a bytearray,
+    where cell (x,y) is byte x * height + y.  Data is accessed via grid[x][y]
+    where (x,y) are positions on a Pacman map with x horizontal, y vertical and
+    the origin (0,0) in the bottom left corner.
+
+    grid[x] is a boolean memoryview of column x, so reading and writing cells
+    stays in C, while copying, counting and listing the cells work on the whole
+    bytearray at once.  A column is not a list: it supports indexing, len,
+    iteration and tolist() but not list methods such as count or index, and
+    any value written to a cell is stored as its truth value (grid[x][y] = 'x'
+    stores True).  Use list(grid[x]) for a list of the column.
 
     The __str__ method constructs an output that is oriented like a pacman board.
     """
@@ -185,19 +198,32 @@ class Grid:
 
         self.width = width
         self.height = height
-        self.data = [[initialValue for y in range(
-            height)] for x in range(width)]
+        self.cells = bytearray([initialValue]) * (width * height)
+        self._columns = None
         if bitRepresentation:
             self._unpackBits(bitRepresentation)
 
     def __getitem__(self, i):
-        return self.data[i]
+        if self._columns is None:
+            cells = memoryview(self.cells).cast('?')
+            height = self.height
+            self._columns = [cells[x * height:(x + 1) * height]
+                             for x in range(self.width)]
+        return self._columns[i]
 
     def __setitem__(self, key, item):
-        self.data[key] = item
+        column = self[key]
+        for y in range(self.height):
+            column[y] = item[y]
+
+    def __getstate__(self):
+        # Memoryviews cannot be pickled; the columns are rebuilt when needed
+        state = self.__dict__.copy()
+        state['_columns'] = None
+        return state
 
     def __str__(self):
-        out = [[str(self.data[x][y])[0] for x in range(self.width)]
+        out = [[str(self[x][y])[0] for x in range(self.width)]
                for y in range(self.height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
@@ -205,22 +231,14 @@ class Grid:
     def __eq__(self, other):
         if other == None:
             return False
-        return self.data == other.data
+        return self.cells == other.cells and self.height == other.height
 
     def __hash__(self):
-        # return hash(str(self))
-        base = 1
-        h = 0
-        for l in self.data:
-            for i in l:
-                if i:
-                    h += base
-                base *= 2
-        return hash(h)
+        return hash(bytes(self.cells))
 
     def copy(self):
         g = Grid(self.width, self.height)
-        g.data = [x[:] for x in self.data]
+        g.cells = self.cells[:]
         return g
 
     def deepCopy(self):
@@ -228,18 +246,23 @@ class Grid:
 
     def shallowCopy(self):
         g = Grid(self.width, self.height)
-        g.data = self.data
+        g.cells = self.cells
         return g
 
     def count(self, item=True):
-        return sum([x.count(item) for x in self.data])
+        cells = self.cells.count(1)
+        if item:
+            return cells
+        return len(self.cells) - cells
 
     def asList(self, key=True):
+        cells, height = self.cells, self.height
+        value = 1 if key else 0
         list = []
-        for x in range(self.width):
-            for y in range(self.height):
-                if self[x][y] == key:
-                    list.append((x, y))
+        i = cells.find(value)
+        while i != -1:
+            list.append((i // height, i % height))
+            i = cells.find(value, i + 1)
         return list
 
     def packBits(self):
@@ -247,50 +270,27 @@ class Grid:
         Returns an efficient int list representation
 
         (width, height, bitPackedInts...)
+
+        where each int holds CELLS_PER_INT cells, the first in its highest bit.
         """
         bits = [self.width, self.height]
-        currentInt = 0
-        for i in range(self.height * self.width):
-            bit = self.CELLS_PER_INT - (i % self.CELLS_PER_INT) - 1
-            x, y = self._cellIndexToPosition(i)
-            if self[x][y]:
-                currentInt += 2 ** bit
-            if (i + 1) % self.CELLS_PER_INT == 0:
-                bits.append(currentInt)
-                currentInt = 0
-        bits.append(currentInt)
+        for i in range(0, len(self.cells) + 1, self.CELLS_PER_INT):
+            digits = self.cells[i:i + self.CELLS_PER_INT].translate(_BITS_TO_DIGITS)
+            bits.append(int(digits.ljust(self.CELLS_PER_INT, b'0'), 2))
         return tuple(bits)
 
-    def _cellIndexToPosition(self, index):
-        x = index / self.height
-        y = index % self.height
-        return x, y
-
     def _unpackBits(self, bits):
         """
         Fills in data from a bit-level representation
         """
-        cell = 0
+        cells = bytearray()
         for packed in bits:
-            for bit in self._unpackInt(packed, self.CELLS_PER_INT):
-                if cell == self.width * self.height:
-                    break
-                x, y = self._cellIndexToPosition(cell)
-                self[x][y] = bit
-                cell += 1
-
-    def _unpackInt(self, packed, size):
-        bools = []
-        if packed < 0:
-            raise ValueError("must be a positive integer")
-        for i in range(size):
-            n = 2 ** (self.CELLS_PER_INT - i - 1)
-            if packed >= n:
-                bools.append(True)
-                packed -= n
-            else:
-                bools.append(False)
-        return bools
+            if packed < 0:
+                raise ValueError("must be a positive integer")
+            digits = format(packed, '0%db' % self.CELLS_PER_INT)
+            cells += digits[-self.CELLS_PER_INT:].encode().translate(_DIGITS_TO_BITS)
+        cells = cells[:len(self.cells)]
+        self.cells[:len(cells)] = cells
 
 
 def reconstituteGrid(bitRep):
@@ -393,19 +393,42 @@ class Actions:
     getSuccessor = staticmethod(getSuccessor)
 
 
+_zobristKeys = {}
+
+
+def zobristKeys(width, height):
+    """
+    Returns two lists of random 64 bit numbers, indexed by x * height + y, that
+    stand for food and for a capsule at (x, y) in the hash of a GameStateData.
+    Boards of the same size always get the same numbers.
+    """
+    if (width, height) not in _zobristKeys:
+        rand = random.Random(0)
+        size = width * height
+        keys = [rand.getrandbits(64) for i in range(2 * size)]
+        _zobristKeys[width, height] = (keys[:size], keys[size:])
+    return _zobristKeys[width, height]
+
+
 class GameStateData:
 
     def __init__(self, prevState=None):
         """
-        Generates a new data packet by copying information from its predecessor.
+        Generates a new data packet from its predecessor.  The food grid, the
+        capsule list and the agent states are shared with prevState rather
+        than copied, so anything that changes them must first replace them by
+        a copy (see copyAgentState).
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates(prevState.agentStates)
+            self.food = prevState.food
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates[:]
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            self._hash = prevState._hash
+            self._numFood = prevState._numFood
+            self._foodPositions = prevState._foodPositions
 
         self._foodEaten = None
         self._foodAdded = None
@@ -418,7 +441,11 @@ class GameStateData:
     def deepCopy(self):
         state = GameStateData(self)
         state.food = self.food.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates(self.agentStates)
         state.layout = self.layout.deepCopy()
+        # The copy has its own food grid, so it gets its own food positions
+        state._foodPositions = self._foodPositions[:]
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
         state._foodAdded = self._foodAdded
@@ -431,6 +458,94 @@ class GameStateData:
             copiedStates.append(agentState.copy())
         return copiedStates
 
+    def copyAgentState(self, index):
+        """
+        Replaces the state of agent index, which may be shared with other game
+        states, by a copy that can safely be changed, and returns the copy.
+        """
+        agentState = self.agentStates[index] = self.agentStates[index].copy()
+        return agentState
+
+    def eatFood(self, x, y):
+        """
+        Removes the food at (x, y) from a copy of the shared food grid, and
+        from the food count and positions.
+        """
+        food = self.food.copy()
+        food[x][y] = False
+        self.food = food
+        self._numFood -= 1
+        self._foodPositions = [None, self._foodPositions, (x, y)]
+        foodKeys, capsuleKeys = zobristKeys(self.layout.width, self.layout.height)
+        self._hash ^= foodKeys[x * self.layout.height + y]
+
+    def foodPositions(self):
+        """
+        Returns a frozenset of the positions of the remaining food, built on
+        first use.  Until food is eaten, a state and its successors share the
+        food grid and a [positions, source, eaten] list, so whichever builds
+        the set builds it for all.  eatFood only starts a new list naming the
+        list it came from and the food eaten: if the source set has been built
+        by then, this set is derived from it, and otherwise it is built from
+        the food grid.
+        """
+        holder = self._foodPositions
+        if holder[0] is None:
+            source = holder[1]
+            if source is not None and source[0] is not None:
+                holder[0] = source[0] - {holder[2]}
+            else:
+                holder[0] = frozenset(self.food.asList())
+            # Let go of the source, which may hold a set of its own
+            holder[1] = None
+        return holder[0]
+
+    def eatCapsule(self, position):
+        """
+        Removes the capsule at position from a copy of the shared capsule list.
+        """
+        self.capsules = self.capsules[:]
+        self.capsules.remove(position)
+        x, y = position
+        foodKeys, capsuleKeys = zobristKeys(self.layout.width, self.layout.height)
+        self._hash ^= capsuleKeys[x * self.layout.height + y]
+
+    def agentHash(self, index, agentState):
+        configuration = agentState.configuration
+        if configuration == None:
+            return hash((index, agentState.scaredTimer))
+        return hash((index, configuration.pos, configuration.direction, agentState.scaredTimer))
+
+    def computeHash(self):
+        """
+        Computes the Zobrist hash of the food, capsules and agent states from
+        scratch: the exclusive or of a random number for each piece of food
+        and each capsule (see zobristKeys) and a hash of each agent state.
+        """
+        foodKeys, capsuleKeys = zobristKeys(self.layout.width, self.layout.height)
+        height = self.layout.height
+        h = 0
+        for x, y in self.food.asList():
+            h ^= foodKeys[x * height + y]
+        for x, y in self.capsules:
+            h ^= capsuleKeys[x * height + y]
+        for index, agentState in enumerate(self.agentStates):
+            h ^= self.agentHash(index, agentState)
+        return h
+
+    def updateHash(self, prevState):
+        """
+        Brings the hash copied from prevState up to date with the agent states
+        that have been replaced since (see copyAgentState).  eatFood and
+        eatCapsule update it themselves.
+        """
+        for index in range(len(self.agentStates)):
+            agentState = self.agentStates[index]
+            prevAgentState = prevState.agentStates[index]
+            if agentState is not prevAgentState:
+                self._hash ^= self.agentHash(index, prevAgentState) ^ \
+                    self.agentHash(index, agentState)
+
     def __eq__(self, other):
         """
         Allows two states to be compared.
@@ -450,25 +565,20 @@ class GameStateData:
 
     def __hash__(self):
         """
-        Allows states to be keys of dictionaries.
+        Allows states to be keys of dictionaries.  The hash of the food,
+        capsules and agent states is kept up to date as they change, so this
+        takes constant time.
         """
-        for i, state in enumerate(self.agentStates):
-            try:
-                int(hash(state))
-            except TypeError as e:
-                print(e)
-                # hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113 * hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575)
+        # hash(-1) == hash(-2), so tell those two scores apart
+        return self._hash ^ hash(self.score) ^ (self.score == -1)
 
     def __str__(self):
         width, height = self.layout.width, self.layout.height
-        map = Grid(width, height)
         if type(self.food) == type((1, 2)):
             self.food = reconstituteGrid(self.food)
-        for x in range(width):
-            for y in range(height):
-                food, walls = self.food, self.layout.walls
-                map[x][y] = self._foodWallStr(food[x][y], walls[x][y])
+        food, walls = self.food, self.layout.walls
+        map = [[self._foodWallStr(food[x][y], walls[x][y])
+                for y in range(height)] for x in range(width)]
 
         for agentState in self.agentStates:
             if agentState == None:
@@ -485,7 +595,9 @@ class GameStateData:
         for x, y in self.capsules:
             map[x][y] = 'o'
 
-        return str(map) + ("\nScore: %d\n" % self.score)
+        rows = [''.join([map[x][y] for x in range(width)])
+                for y in range(height - 1, -1, -1)]
+        return '\n'.join(rows) + ("\nScore: %d\n" % self.score)
 
     def _foodWallStr(self, hasFood, hasWall):
         if hasFood:
@@ -536,6 +648,9 @@ class GameStateData:
             self.agentStates.append(AgentState(
                 Configuration(pos, Directions.STOP), isPacman))
         self._eaten = [False for a in self.agentStates]
+        self._hash = self.computeHash()
+        self._numFood = self.food.count()
+        self._foodPositions = [None, None, None]
 
 
 try: